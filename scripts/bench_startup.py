@@ -0,0 +1,97 @@
+"""
+Benchmark de tempo de inicialização do CLI do ETL
+Usa `python -X importtime` para medir o custo de importação de src.etl.main
+e falha se dependências pesadas forem importadas no caminho de startup.
+
+Uso:
+    python scripts/bench_startup.py [--runs 5] [--budget-ms 250] [--top 10]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TARGET_MODULE = "src.etl.main"
+
+# Módulos que não devem ser importados apenas por carregar o CLI
+FORBIDDEN_MODULES = ("pandas", "openai", "numpy")
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(output: str) -> dict[str, tuple[int, int]]:
+    """
+    Converte a saída de `-X importtime` em {módulo: (self_us, cumulative_us)}
+
+    Args:
+        output: Conteúdo do stderr do interpretador
+
+    Returns:
+        Dicionário com tempos próprio e cumulativo em microssegundos
+    """
+    modules = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import(module: str = TARGET_MODULE) -> dict[str, tuple[int, int]]:
+    """Executa um interpretador novo importando o módulo e retorna os tempos"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def forbidden_imports(modules: dict[str, tuple[int, int]]) -> list[str]:
+    """Retorna os módulos pesados (de FORBIDDEN_MODULES) presentes na importação"""
+    return sorted(name for name in modules if name in FORBIDDEN_MODULES)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de startup do CLI do ETL")
+    parser.add_argument("--runs", type=int, default=5, help="Número de execuções")
+    parser.add_argument("--budget-ms", type=float, default=250.0,
+                        help="Tempo cumulativo máximo (mediana) de import, em ms")
+    parser.add_argument("--top", type=int, default=10, help="Quantidade de módulos mais lentos a exibir")
+    args = parser.parse_args()
+
+    totals_ms = []
+    last_run = {}
+    for _ in range(args.runs):
+        last_run = measure_import()
+        totals_ms.append(last_run[TARGET_MODULE][1] / 1000)
+
+    median_ms = statistics.median(totals_ms)
+    print(f"Import de {TARGET_MODULE}: mediana {median_ms:.1f} ms "
+          f"(min {min(totals_ms):.1f} ms, max {max(totals_ms):.1f} ms, {args.runs} execuções)")
+
+    print(f"\nTop {args.top} módulos por tempo cumulativo (última execução):")
+    slowest = sorted(last_run.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (_, cumulative_us) in slowest[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    failed = False
+    heavy = forbidden_imports(last_run)
+    if heavy:
+        print(f"\nERRO: dependências pesadas importadas no startup: {', '.join(heavy)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"\nERRO: startup acima do orçamento ({median_ms:.1f} ms > {args.budget_ms:.1f} ms)")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,27 @@
 """
 Mock Server para simular a API Santander Dev Week
-Útil quando a API real está indisponível
+Útil quando a API real está indisponível e para testes de carga/soak
+
+Recursos:
+- Usuários gerados sob demanda (até milhões, sem ocupar memória)
+- Armazenamento thread-safe (servidor multi-thread)
+- Latência, erros 500 e 429 injetáveis
+- ETag/If-None-Match/If-Match e endpoints em lote
+- Estatísticas por endpoint em GET /_stats
+
+Roda no servidor de desenvolvimento do Werkzeug (app.run com threaded=True,
+uma thread por conexão), não num servidor WSGI de produção: serve para
+carga e soak locais, mas os números não representam um deploy real.
 """
-from flask import Flask, jsonify, request
+import argparse
+import hashlib
+import json
 import logging
-
-app = Flask(__name__)
-logging.basicConfig(level=logging.INFO)
+import random
+import threading
+import time
+from collections import deque
+from flask import Flask, g, jsonify, request
 
 # Dados mock de usuários
 MOCK_USERS = {
@@ -52,49 +67,305 @@ MOCK_USERS = {
     }
 }
 
-@app.route('/users/<int:user_id>', methods=['GET'])
-def get_user(user_id):
-    """Retorna dados de um usuário"""
-    user = MOCK_USERS.get(user_id)
-    
-    if user:
-        app.logger.info(f"GET /users/{user_id} - 200 OK")
-        return jsonify(user), 200
-    else:
-        app.logger.warning(f"GET /users/{user_id} - 404 Not Found")
-        return jsonify({"error": "User not found"}), 404
-
-@app.route('/users/<int:user_id>', methods=['PUT'])
-def update_user(user_id):
-    """Atualiza dados de um usuário"""
-    if user_id not in MOCK_USERS:
-        app.logger.warning(f"PUT /users/{user_id} - 404 Not Found")
-        return jsonify({"error": "User not found"}), 404
-    
-    data = request.get_json()
-    MOCK_USERS[user_id] = data
-    
-    app.logger.info(f"PUT /users/{user_id} - 200 OK")
-    app.logger.debug(f"Updated data: {data}")
-    
-    return jsonify(data), 200
-
-@app.route('/users', methods=['GET'])
-def list_users():
-    """Lista todos os usuários"""
-    return jsonify(list(MOCK_USERS.values())), 200
+# Nomes para usuários gerados (repetem-se, como numa base real)
+FIRST_NAMES = ["João", "Maria", "Carlos", "Ana", "Pedro", "Juliana", "Lucas", "Fernanda", "Rafael", "Beatriz"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Costa", "Alves", "Souza", "Lima", "Pereira", "Ferreira", "Rodrigues"]
+
+# Endpoints sujeitos a latência/erros injetados
+API_ENDPOINTS = {"get_user", "update_user", "list_users", "bulk_get_users", "bulk_update_users", "chat_completions"}
+
+LATENCY_SAMPLES = 10000
+
+# GET /users sem paginação só lista tudo até este total de usuários
+LIST_ALL_MAX = 1000
+
+
+def generate_user(user_id):
+    """Gera um usuário determinístico a partir do ID"""
+    if user_id in MOCK_USERS:
+        return MOCK_USERS[user_id]
+    first = FIRST_NAMES[user_id % len(FIRST_NAMES)]
+    last = LAST_NAMES[(user_id // len(FIRST_NAMES)) % len(LAST_NAMES)]
+    return {
+        "id": user_id,
+        "name": f"{first} {last}",
+        "account": {"number": f"{user_id:05d}-{user_id % 10}", "agency": "0001"},
+        "card": {"number": f"**** {user_id % 10000:04d}", "limit": float(1000 * (1 + user_id % 10))},
+        "features": [],
+        "news": []
+    }
+
+
+def compute_etag(user):
+    """ETag forte a partir do conteúdo do usuário"""
+    return hashlib.md5(json.dumps(user, sort_keys=True).encode()).hexdigest()
+
+
+class UserStore:
+    """
+    Armazenamento thread-safe de usuários
+
+    Usuários de 1..num_users são gerados sob demanda; apenas os alterados
+    via PUT ficam em memória.
+    """
+
+    def __init__(self, num_users=len(MOCK_USERS)):
+        self.num_users = num_users
+        self._updated = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            user = self._updated.get(user_id)
+        if user is None and 1 <= user_id <= self.num_users:
+            user = generate_user(user_id)
+        return user
+
+    def put(self, user_id, data, if_match=None):
+        """
+        Substitui o usuário. Retorna (usuário, status) com status 404
+        (inexistente), 412 (If-Match divergente) ou 200
+        """
+        with self._lock:
+            current = self._updated.get(user_id)
+            if current is None and 1 <= user_id <= self.num_users:
+                current = generate_user(user_id)
+            if current is None:
+                return None, 404
+            if if_match and if_match.strip('"') != compute_etag(current):
+                return current, 412
+            self._updated[user_id] = data
+            return data, 200
+
+    def page(self, offset, limit):
+        ids = range(offset + 1, min(offset + limit, self.num_users) + 1)
+        return [self.get(user_id) for user_id in ids]
+
+
+class Stats:
+    """Contagem de requisições, status e latência por endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def record(self, endpoint, status, elapsed):
+        with self._lock:
+            entry = self._endpoints.setdefault(endpoint, {
+                "count": 0, "total": 0.0, "max": 0.0, "status": {},
+                "samples": deque(maxlen=LATENCY_SAMPLES)
+            })
+            entry["count"] += 1
+            entry["total"] += elapsed
+            entry["max"] = max(entry["max"], elapsed)
+            entry["status"][str(status)] = entry["status"].get(str(status), 0) + 1
+            entry["samples"].append(elapsed)
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, entry in self._endpoints.items():
+                samples = sorted(entry["samples"])
+                result[endpoint] = {
+                    "count": entry["count"],
+                    "status": dict(entry["status"]),
+                    "latency_ms": {
+                        "avg": round(entry["total"] / entry["count"] * 1000, 3),
+                        "p50": round(samples[len(samples) // 2] * 1000, 3),
+                        "p95": round(samples[int(len(samples) * 0.95)] * 1000, 3),
+                        "max": round(entry["max"] * 1000, 3)
+                    }
+                }
+            return result
+
+
+def create_app(num_users=len(MOCK_USERS), latency_ms=0.0, jitter_ms=0.0,
+               error_rate=0.0, throttle_rate=0.0, seed=None):
+    """
+    Cria o app Flask do mock server
+
+    Args:
+        num_users: Quantidade de usuários gerados (IDs 1..num_users)
+        latency_ms: Latência fixa adicionada às respostas da API
+        jitter_ms: Variação aleatória máxima somada à latência
+        error_rate: Fração de respostas 500 injetadas (0..1)
+        throttle_rate: Fração de respostas 429 injetadas (0..1)
+        seed: Semente do gerador aleatório (reprodutibilidade)
+    """
+    app = Flask(__name__)
+    store = UserStore(num_users)
+    stats = Stats()
+    rng = random.Random(seed)
+    app.config.update(STORE=store, STATS=stats)
+
+    @app.before_request
+    def inject_faults():
+        g.start = time.perf_counter()
+        if request.endpoint not in API_ENDPOINTS:
+            return None
+        if latency_ms or jitter_ms:
+            time.sleep((latency_ms + rng.uniform(0, jitter_ms)) / 1000)
+        if throttle_rate and rng.random() < throttle_rate:
+            response = jsonify({"error": "Too Many Requests"})
+            response.status_code = 429
+            response.headers["Retry-After"] = "1"
+            return response
+        if error_rate and rng.random() < error_rate:
+            return jsonify({"error": "Injected failure"}), 500
+        return None
+
+    @app.after_request
+    def record_stats(response):
+        if request.endpoint in API_ENDPOINTS:
+            endpoint = f"{request.method} {request.url_rule.rule}"
+            stats.record(endpoint, response.status_code, time.perf_counter() - g.start)
+        return response
+
+    @app.route('/users/<int:user_id>', methods=['GET'])
+    def get_user(user_id):
+        """Retorna dados de um usuário"""
+        user = store.get(user_id)
+        if user is None:
+            return jsonify({"error": "User not found"}), 404
+
+        etag = compute_etag(user)
+        if request.headers.get("If-None-Match", "").strip('"') == etag:
+            return "", 304, {"ETag": f'"{etag}"'}
+        return jsonify(user), 200, {"ETag": f'"{etag}"'}
+
+    @app.route('/users/<int:user_id>', methods=['PUT'])
+    def update_user(user_id):
+        """Atualiza dados de um usuário"""
+        data = request.get_json()
+        user, status = store.put(user_id, data, request.headers.get("If-Match"))
+
+        if status == 404:
+            return jsonify({"error": "User not found"}), 404
+        if status == 412:
+            return jsonify({"error": "ETag mismatch"}), 412
+        return jsonify(user), 200, {"ETag": f'"{compute_etag(user)}"'}
+
+    @app.route('/users', methods=['GET'])
+    def list_users():
+        """
+        Lista todos os usuários (até LIST_ALL_MAX), ou uma página com
+        ?offset=0&limit=100; acima de LIST_ALL_MAX a paginação é obrigatória
+        """
+        if "offset" not in request.args and "limit" not in request.args:
+            if store.num_users > LIST_ALL_MAX:
+                return jsonify({
+                    "error": f"Mais de {LIST_ALL_MAX} usuários: use ?offset=&limit="
+                }), 400
+            return jsonify(store.page(0, store.num_users)), 200
+        offset = request.args.get("offset", 0, type=int)
+        limit = min(request.args.get("limit", 100, type=int), 1000)
+        return jsonify(store.page(offset, limit)), 200
+
+    @app.route('/users/bulk-get', methods=['POST'])
+    def bulk_get_users():
+        """Retorna vários usuários: {"ids": [...]} -> {"users": [...], "missing": [...]}"""
+        ids = request.get_json().get("ids", [])
+        users, missing = [], []
+        for user_id in ids:
+            user = store.get(int(user_id))
+            if user is None:
+                missing.append(user_id)
+            else:
+                users.append(user)
+        return jsonify({"users": users, "missing": missing}), 200
+
+    @app.route('/users/bulk', methods=['PUT'])
+    def bulk_update_users():
+        """Atualiza vários usuários: {"users": [...]} -> {"results": {id: status}}"""
+        results = {}
+        for user in request.get_json().get("users", []):
+            _, status = store.put(int(user["id"]), user)
+            results[str(user["id"])] = status
+        return jsonify({"results": results}), 200
+
+    @app.route('/v1/chat/completions', methods=['POST'])
+    def chat_completions():
+        """Simula o endpoint de chat completions da OpenAI"""
+        data = request.get_json()
+        prompt = data["messages"][-1]["content"]
+        name = (prompt.replace("Cliente: ", "").split() or ["Cliente"])[0]
+
+        return jsonify({
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": 0,
+            "model": data.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": f"{name}, investir hoje garante seu amanhã. Comece já!"
+                }
+            }]
+        }), 200
+
+    @app.route('/_stats', methods=['GET'])
+    def get_stats():
+        """Requisições e latência por endpoint"""
+        return jsonify(stats.snapshot()), 200
+
+    @app.route('/_stats', methods=['DELETE'])
+    def reset_stats():
+        """Zera as estatísticas"""
+        stats.reset()
+        return "", 204
+
+    return app
+
+
+app = create_app()
+
+
+def parse_args():
+    """Parse argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(description="Mock Server - Santander Dev Week API")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=len(MOCK_USERS), help="Usuários gerados (IDs 1..N)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência adicionada por resposta")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Variação aleatória da latência")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fração de respostas 500 (0..1)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fração de respostas 429 (0..1)")
+    parser.add_argument("--seed", type=int, default=None, help="Semente para a injeção de falhas")
+    parser.add_argument("--verbose", action="store_true", help="Loga cada requisição")
+    return parser.parse_args()
+
 
 if __name__ == '__main__':
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not args.verbose:
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    app = create_app(args.users, args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate, args.seed)
+
     print("=" * 60)
     print("Mock Server - Santander Dev Week API")
     print("=" * 60)
-    print("Servidor rodando em: http://localhost:5000")
+    print(f"Servidor rodando em: http://localhost:{args.port}")
+    print(f"Usuários: {args.users} | Latência: {args.latency_ms}+{args.jitter_ms} ms | "
+          f"Erros: {args.error_rate:.0%} | 429: {args.throttle_rate:.0%}")
     print("\nEndpoints disponíveis:")
-    print("  GET  /users/<id>  - Buscar usuário")
-    print("  PUT  /users/<id>  - Atualizar usuário")
-    print("  GET  /users       - Listar todos")
+    print("  GET  /users/<id>         - Buscar usuário (ETag / If-None-Match)")
+    print("  PUT  /users/<id>         - Atualizar usuário (If-Match opcional)")
+    print(f"  GET  /users              - Listar todos (até {LIST_ALL_MAX}) ou página com ?offset=&limit=")
+    print("  POST /users/bulk-get     - Buscar vários usuários")
+    print("  PUT  /users/bulk         - Atualizar vários usuários")
+    print("  POST /v1/chat/completions - Simula a OpenAI")
+    print("  GET  /_stats             - Estatísticas por endpoint (DELETE zera)")
     print("\nPara usar no ETL, configure:")
-    print("  --api-url http://localhost:5000")
+    print(f"  --api-url http://localhost:{args.port}")
+    print(f"  OPENAI_BASE_URL=http://localhost:{args.port}/v1 (modo real offline)")
     print("=" * 60)
-    
-    app.run(host='0.0.0.0', port=5000, debug=True)
+
+    app.run(host=args.host, port=args.port, threaded=True)
@@ -14,13 +14,46 @@ HTTP_TIMEOUT = 10
 OPENAI_TIMEOUT = 30
 MAX_RETRIES = 3
 RETRY_BACKOFF_FACTOR = 2
+# Requisições simultâneas à API SDW em extract/load (1 = sequencial)
+HTTP_CONCURRENCY = int(os.getenv("HTTP_CONCURRENCY", "1"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "10"))
+# Rate limit (token bucket) por backend; 0 desliga o limite
+SDW_RATE_LIMIT = float(os.getenv("SDW_RATE_LIMIT", "0"))  # requisições/s
+SDW_RATE_BURST = float(os.getenv("SDW_RATE_BURST", "10"))
+OPENAI_RATE_LIMIT = float(os.getenv("OPENAI_RATE_LIMIT", "0"))  # requisições/s
+OPENAI_RATE_BURST = float(os.getenv("OPENAI_RATE_BURST", "5"))
+OPENAI_TOKENS_PER_MINUTE = float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))
+# Diretório para compartilhar os buckets entre processos do host (vazio = só no processo)
+RATE_LIMIT_DIR = os.getenv("RATE_LIMIT_DIR") or None
+# HTTP/2 multiplexado (requer httpx[http2]); cai para HTTP/1.1 se indisponível
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+# Usa HTTP/2 sem TLS (h2c) em URLs http://, ex.: mock server local
+HTTP2_PRIOR_KNOWLEDGE = os.getenv("HTTP2_PRIOR_KNOWLEDGE", "false").lower() == "true"
+
+# Incremental Configuration (--campaign)
+STATE_DIR = os.getenv("STATE_DIR", ".etl-state")
+
+# Profiling Configuration (--profile)
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))  # segundos entre amostras
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "20"))
 
 # Message Configuration
 MAX_MESSAGE_LENGTH = 100
+# Variações de mensagem geradas por grupo de usuários com o mesmo prompt
+MESSAGE_VARIANTS = int(os.getenv("MESSAGE_VARIANTS", "1"))
+# Threads usadas para pré-gerar mensagens durante a extração (--prefetch)
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
 NEWS_ICON_URL = "https://digitalinnovationone.github.io/santander-dev-week-2023-api/icons/credit.svg"
 
 # OpenAI Configuration
 OPENAI_MODEL = "gpt-4"
+OPENAI_MAX_TOKENS = 50
+# Permite apontar para um servidor compatível com OpenAI (ex.: mock local)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# Pool de conexões HTTP do cliente OpenAI compartilhado
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "10"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "5"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
 SYSTEM_PROMPT = (
     "Você é um especialista em marketing bancário. "
     "Escreva UMA mensagem curta, cordial, pessoal e persuasiva sobre a importância dos investimentos. "
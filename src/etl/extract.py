@@ -1,9 +1,11 @@
 """Módulo de extração de dados"""
 import logging
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests
-from typing import List, Optional, Dict, Any
-from src.etl.config import SDW_API_URL, HTTP_TIMEOUT
+from typing import List, Optional, Dict, Any, Callable
+from src.etl.config import SDW_API_URL, HTTP_TIMEOUT, HTTP_CONCURRENCY
+from src.etl.http_client import request_http2
+from src.etl.ratelimit import get_limiter
 from src.etl.utils import retry_with_backoff
 
 logger = logging.getLogger("etl")
@@ -18,6 +20,9 @@ def read_csv(file_path: str) -> List[int]:
     Returns:
         Lista de IDs de usuários
     """
+    # Import tardio: pandas é pesado e só é necessário na leitura do CSV
+    import pandas as pd
+
     try:
         df = pd.read_csv(file_path)
         user_ids = df['UserID'].dropna().astype(int).tolist()
@@ -27,6 +32,32 @@ def read_csv(file_path: str) -> List[int]:
         logger.error(f"Erro ao ler CSV {file_path}: {e}")
         raise
 
+def read_csv_records(file_path: str, extra_columns: List[str]) -> List[Dict[str, Any]]:
+    """
+    Lê arquivo CSV com UserID e colunas adicionais (ex.: nome do usuário)
+    
+    Args:
+        file_path: Caminho do arquivo CSV
+        extra_columns: Colunas a ler além de UserID (ex.: ["Name"])
+        
+    Returns:
+        Lista de registros {"UserID": id, <coluna>: valor}
+        (valores ausentes viram None)
+    """
+    # Import tardio: pandas é pesado e só é necessário na leitura do CSV
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(file_path)
+        df = df[['UserID'] + list(extra_columns)].dropna(subset=['UserID'])
+        df = df.astype({'UserID': int}).astype(object).where(df.notna(), None)
+        records = df.to_dict('records')
+        logger.info(f"Lidos {len(records)} registros do arquivo {file_path}")
+        return records
+    except Exception as e:
+        logger.error(f"Erro ao ler CSV {file_path}: {e}")
+        raise
+
 @retry_with_backoff()
 def get_user(user_id: int, api_url: str = SDW_API_URL) -> Optional[Dict[str, Any]]:
     """
@@ -41,8 +72,12 @@ def get_user(user_id: int, api_url: str = SDW_API_URL) -> Optional[Dict[str, Any
     """
     url = f"{api_url}/users/{user_id}"
     
+    get_limiter("sdw").acquire()
+    
     try:
-        response = requests.get(url, timeout=HTTP_TIMEOUT)
+        response = request_http2("GET", url)
+        if response is None:
+            response = requests.get(url, timeout=HTTP_TIMEOUT)
         
         if response.status_code == 200:
             user = response.json()
@@ -62,27 +97,78 @@ def get_user(user_id: int, api_url: str = SDW_API_URL) -> Optional[Dict[str, Any
         logger.error(f"Erro de requisição ao buscar usuário {user_id}: {e}")
         raise
 
-def extract_users(user_ids: List[int], api_url: str = SDW_API_URL) -> List[Dict[str, Any]]:
+def _notify_user(on_user: Optional[Callable[[Dict[str, Any]], None]], user: Dict[str, Any]) -> None:
+    """Chama o callback on_user sem afetar a extração do usuário"""
+    if not on_user:
+        return
+    try:
+        on_user(user)
+    except Exception as e:
+        logger.warning(f"Callback on_user falhou para usuário {user.get('id')}: {e}")
+
+def extract_users(
+    user_ids: List[int],
+    api_url: str = SDW_API_URL,
+    on_user: Optional[Callable[[Dict[str, Any]], None]] = None,
+    max_workers: int = HTTP_CONCURRENCY
+) -> List[Dict[str, Any]]:
     """
     Extrai dados de múltiplos usuários
     
     Args:
         user_ids: Lista de IDs
         api_url: URL base da API
+        on_user: Callback chamado com cada usuário assim que o GET retorna
+            (ex.: para iniciar a geração de mensagens antecipadamente)
+        max_workers: Requisições simultâneas (com HTTP/2, multiplexadas
+            numa única conexão)
         
     Returns:
-        Lista de usuários válidos
+        Lista de usuários válidos (na ordem dos IDs)
     """
+    if max_workers > 1:
+        return _extract_users_concurrent(user_ids, api_url, on_user, max_workers)
+    
     users = []
     
     for user_id in user_ids:
         try:
             user = get_user(user_id, api_url)
-            if user:
-                users.append(user)
         except Exception as e:
             logger.error(f"Pulando usuário {user_id} devido a erro: {e}")
             continue
+        
+        if user:
+            users.append(user)
+            _notify_user(on_user, user)
+    
+    logger.info(f"Total de {len(users)} usuários extraídos com sucesso")
+    return users
+
+def _extract_users_concurrent(
+    user_ids: List[int],
+    api_url: str,
+    on_user: Optional[Callable[[Dict[str, Any]], None]],
+    max_workers: int
+) -> List[Dict[str, Any]]:
+    """Versão concorrente de extract_users (preserva a ordem dos IDs)"""
+    results: Dict[int, Dict[str, Any]] = {}
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl-extract") as executor:
+        futures = {executor.submit(get_user, user_id, api_url): index for index, user_id in enumerate(user_ids)}
+        
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                user = future.result()
+            except Exception as e:
+                logger.error(f"Pulando usuário {user_ids[index]} devido a erro: {e}")
+                continue
+            
+            if user:
+                results[index] = user
+                _notify_user(on_user, user)
     
+    users = [results[index] for index in sorted(results)]
     logger.info(f"Total de {len(users)} usuários extraídos com sucesso")
     return users
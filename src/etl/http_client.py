@@ -0,0 +1,120 @@
+"""Cliente HTTP/2 compartilhado para chamadas à API SDW"""
+import logging
+import threading
+from typing import Any, Optional, Set
+from urllib.parse import urlsplit
+import requests
+from src.etl.config import (
+    HTTP_TIMEOUT,
+    HTTP2_ENABLED,
+    HTTP2_PRIOR_KNOWLEDGE,
+    HTTP_MAX_CONNECTIONS
+)
+
+logger = logging.getLogger("etl")
+
+_http2_enabled = HTTP2_ENABLED
+_http2_client = None
+_http2_unavailable = False
+# Hosts (scheme://host:porta) que não falam HTTP/2 e usam HTTP/1.1
+_http1_hosts: Set[str] = set()
+_http2_lock = threading.Lock()
+
+def enable_http2(enabled: bool = True) -> None:
+    """
+    Liga/desliga o transporte HTTP/2 para get_user e update_user
+
+    Args:
+        enabled: True para usar HTTP/2 (com fallback para HTTP/1.1)
+    """
+    global _http2_enabled
+    _http2_enabled = enabled
+
+def get_http2_client():
+    """
+    Retorna o cliente HTTP/2 compartilhado, criando-o na primeira chamada
+
+    Um único cliente multiplexa as requisições concorrentes em streams de
+    uma mesma conexão por host. Se o HTTP/2 estiver desligado ou o pacote
+    `h2` não estiver instalado, retorna None (fallback para HTTP/1.1).
+
+    Returns:
+        Instância de httpx.Client ou None
+    """
+    global _http2_client, _http2_unavailable
+
+    if not _http2_enabled or _http2_unavailable:
+        return None
+    if _http2_client is not None:
+        return _http2_client
+
+    with _http2_lock:
+        if _http2_client is None and not _http2_unavailable:
+            try:
+                # Import tardio: httpx/h2 só são necessários com HTTP/2 ligado
+                import httpx
+                _http2_client = httpx.Client(
+                    http2=True,
+                    # Sem TLS/ALPN, HTTP/2 só com "prior knowledge" (h2c)
+                    http1=not HTTP2_PRIOR_KNOWLEDGE,
+                    timeout=HTTP_TIMEOUT,
+                    limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS)
+                )
+                logger.debug("Cliente HTTP/2 criado para a API SDW")
+            except ImportError as e:
+                _http2_unavailable = True
+                logger.warning(f"HTTP/2 indisponível ({e}) - usando HTTP/1.1")
+
+    return _http2_client
+
+def close_http2_client() -> None:
+    """Fecha o cliente HTTP/2 compartilhado e libera as conexões"""
+    global _http2_client
+
+    with _http2_lock:
+        if _http2_client is not None:
+            _http2_client.close()
+            _http2_client = None
+        _http1_hosts.clear()
+
+def request_http2(method: str, url: str, **kwargs: Any) -> Optional[Any]:
+    """
+    Faz uma requisição pelo cliente HTTP/2 compartilhado
+
+    Se o servidor não falar HTTP/2 (erro de protocolo, ex.: h2c recusado),
+    o host é marcado para usar HTTP/1.1 e a função retorna None, para que
+    quem chama refaça a requisição via requests. Demais exceções do httpx
+    (inclusive falhas de conexão) são convertidas nas equivalentes do
+    requests, para que retry_with_backoff as trate normalmente.
+
+    Args:
+        method: Método HTTP ("GET", "PUT", ...)
+        url: URL completa
+        **kwargs: Argumentos repassados para httpx.Client.request
+
+    Returns:
+        httpx.Response, ou None se o HTTP/2 não estiver em uso para o host
+    """
+    client = get_http2_client()
+    if client is None:
+        return None
+
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+    if host in _http1_hosts:
+        return None
+
+    import httpx
+
+    try:
+        return client.request(method, url, **kwargs)
+    except httpx.ProtocolError as e:
+        with _http2_lock:
+            if host not in _http1_hosts:
+                _http1_hosts.add(host)
+                logger.warning(f"HTTP/2 falhou para {host} ({e}) - usando HTTP/1.1")
+        return None
+    except httpx.TimeoutException as e:
+        raise requests.exceptions.Timeout(str(e)) from e
+    except httpx.HTTPError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from e
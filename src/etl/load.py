@@ -1,8 +1,11 @@
 """Módulo de carregamento e atualização de dados"""
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from typing import Dict, Any
-from src.etl.config import SDW_API_URL, HTTP_TIMEOUT, NEWS_ICON_URL
+from src.etl.config import SDW_API_URL, HTTP_TIMEOUT, NEWS_ICON_URL, HTTP_CONCURRENCY
+from src.etl.http_client import request_http2
+from src.etl.ratelimit import get_limiter
 from src.etl.utils import retry_with_backoff
 
 logger = logging.getLogger("etl")
@@ -84,8 +87,12 @@ def update_user(user: Dict[str, Any], api_url: str = SDW_API_URL, dry_run: bool
     # Remove campos internos antes de enviar
     payload = {k: v for k, v in user.items() if not k.startswith('_')}
     
+    get_limiter("sdw").acquire()
+    
     try:
-        response = requests.put(url, json=payload, timeout=HTTP_TIMEOUT)
+        response = request_http2("PUT", url, json=payload)
+        if response is None:
+            response = requests.put(url, json=payload, timeout=HTTP_TIMEOUT)
         
         if response.status_code == 200:
             logger.info(f"Usuário {user_id} atualizado com sucesso")
@@ -102,7 +109,34 @@ def update_user(user: Dict[str, Any], api_url: str = SDW_API_URL, dry_run: bool
         logger.error(f"Erro de requisição ao atualizar usuário {user_id}: {e}")
         raise
 
-def load_users(users: list[Dict[str, Any]], api_url: str = SDW_API_URL, dry_run: bool = False) -> Dict[str, int]:
+def _load_user(user: Dict[str, Any], api_url: str, dry_run: bool) -> str:
+    """Processa um usuário e retorna a chave de estatística ("success", "failed" ou "skipped")"""
+    if not user.get('generated_message'):
+        logger.warning(f"Usuário {user.get('id')} sem mensagem - pulando")
+        return "skipped"
+    
+    # Adiciona notícia ao usuário
+    user = add_news_to_user(user, user['generated_message'])
+    
+    if user.get('_skipped'):
+        # Notícia já presente: usuário já recebeu a campanha
+        user['_loaded'] = True
+        return "skipped"
+    
+    try:
+        success = update_user(user, api_url, dry_run)
+        user['_loaded'] = bool(success)
+        return "success" if success else "failed"
+    except Exception as e:
+        logger.error(f"Erro ao processar usuário {user.get('id')}: {e}")
+        return "failed"
+
+def load_users(
+    users: list[Dict[str, Any]],
+    api_url: str = SDW_API_URL,
+    dry_run: bool = False,
+    max_workers: int = HTTP_CONCURRENCY
+) -> Dict[str, int]:
     """
     Carrega/atualiza múltiplos usuários
     
@@ -110,34 +144,22 @@ def load_users(users: list[Dict[str, Any]], api_url: str = SDW_API_URL, dry_run:
         users: Lista de usuários
         api_url: URL base da API
         dry_run: Se True, não faz requisições reais
+        max_workers: Requisições simultâneas (com HTTP/2, multiplexadas
+            numa única conexão)
         
     Returns:
         Estatísticas de sucesso/falha
     """
     stats = {"success": 0, "failed": 0, "skipped": 0}
     
-    for user in users:
-        if not user.get('generated_message'):
-            logger.warning(f"Usuário {user.get('id')} sem mensagem - pulando")
-            stats["skipped"] += 1
-            continue
-        
-        # Adiciona notícia ao usuário
-        user = add_news_to_user(user, user['generated_message'])
-        
-        if user.get('_skipped'):
-            stats["skipped"] += 1
-            continue
-        
-        try:
-            success = update_user(user, api_url, dry_run)
-            if success:
-                stats["success"] += 1
-            else:
-                stats["failed"] += 1
-        except Exception as e:
-            logger.error(f"Erro ao processar usuário {user.get('id')}: {e}")
-            stats["failed"] += 1
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl-load") as executor:
+            outcomes = list(executor.map(lambda user: _load_user(user, api_url, dry_run), users))
+    else:
+        outcomes = [_load_user(user, api_url, dry_run) for user in users]
+    
+    for outcome in outcomes:
+        stats[outcome] += 1
     
     logger.info(f"Carregamento concluído - Sucesso: {stats['success']}, Falha: {stats['failed']}, Pulados: {stats['skipped']}")
     return stats
@@ -1,10 +1,14 @@
 """Entry point do pipeline ETL"""
 import argparse
 import sys
-from src.etl.config import SDW_API_URL, LOG_LEVEL
+from contextlib import nullcontext
+from src.etl.config import SDW_API_URL, LOG_LEVEL, MESSAGE_VARIANTS, HTTP_CONCURRENCY, HTTP2_ENABLED
+from src.etl.http_client import enable_http2, close_http2_client
+from src.etl.profiling import profile_run, stage
+from src.etl.state import CampaignState
 from src.etl.utils import setup_logging
-from src.etl.extract import read_csv, extract_users
-from src.etl.transform import transform_users
+from src.etl.extract import read_csv, read_csv_records, extract_users
+from src.etl.transform import transform_users, close_openai_client, MessagePrefetcher
 from src.etl.load import load_users
 
 def parse_args():
@@ -36,6 +40,63 @@ def parse_args():
         default=SDW_API_URL,
         help="URL base da API (padrão: SDW_API_URL do .env)"
     )
+    parser.add_argument(
+        "--variants",
+        type=int,
+        default=MESSAGE_VARIANTS,
+        help="Variações de mensagem por grupo de usuários com o mesmo nome"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=HTTP_CONCURRENCY,
+        help="Requisições simultâneas à API em extract/load (1 = sequencial)"
+    )
+    parser.add_argument(
+        "--http2",
+        action=argparse.BooleanOptionalAction,
+        default=HTTP2_ENABLED,
+        help="Usa HTTP/2 multiplexado na API (fallback automático para HTTP/1.1)"
+    )
+    parser.add_argument(
+        "--prefetch",
+        action="store_true",
+        help="Gera mensagens em background enquanto a extração ainda está rodando"
+    )
+    parser.add_argument(
+        "--name-column",
+        type=str,
+        default=None,
+        help="Coluna do CSV com o nome do usuário, usada para antecipar a geração (--prefetch)"
+    )
+    parser.add_argument(
+        "--campaign",
+        type=str,
+        default=None,
+        help="Modo incremental: processa apenas IDs novos/alterados desde a última execução da campanha"
+    )
+    parser.add_argument(
+        "--updated-column",
+        type=str,
+        default=None,
+        help="Coluna do CSV com a data de alteração (ISO 8601) para reprocessar usuários alterados"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Com --campaign, ignora o estado salvo e reprocessa todos os IDs"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Executa com profiler por amostragem e grava flame graph + resumo"
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        default="etl-profile",
+        help="Prefixo dos arquivos de profile (.collapsed e .txt)"
+    )
     parser.add_argument(
         "--log-level",
         type=str,
@@ -46,6 +107,78 @@ def parse_args():
     
     return parser.parse_args()
 
+def run_pipeline(args, logger, prefetcher=None, state=None):
+    """Executa as etapas extract, transform e load (marcadas para profiling)"""
+    # EXTRACT
+    with stage("extract"):
+        logger.info("\n[EXTRACT] Iniciando extração de dados...")
+        extra_columns = [column for column in (args.name_column, args.updated_column) if column]
+        if extra_columns:
+            records = read_csv_records(args.csv, extra_columns)
+            user_ids = [record['UserID'] for record in records]
+        else:
+            records = None
+            user_ids = read_csv(args.csv)
+        
+        if not user_ids:
+            logger.error("Nenhum ID encontrado no CSV")
+            sys.exit(1)
+        
+        if state and not args.full:
+            updated_at = [record[args.updated_column] for record in records] if args.updated_column else None
+            pending = set(state.pending(user_ids, updated_at))
+            logger.info(f"Modo incremental: {len(pending)}/{len(user_ids)} IDs novos ou alterados")
+            if records:
+                records = [record for record in records if record['UserID'] in pending]
+            user_ids = [user_id for user_id in user_ids if user_id in pending]
+            
+            if not user_ids:
+                logger.info("Nada a processar para a campanha")
+                return {"success": 0, "failed": 0, "skipped": 0}
+        
+        if prefetcher and args.name_column:
+            for record in records:
+                if record[args.name_column]:
+                    prefetcher.submit({"id": record['UserID'], "name": record[args.name_column]})
+        
+        users = extract_users(
+            user_ids,
+            args.api_url,
+            prefetcher.submit if prefetcher else None,
+            args.concurrency
+        )
+        
+        if not users:
+            logger.error("Nenhum usuário válido encontrado")
+            sys.exit(1)
+    
+    # TRANSFORM
+    with stage("transform"):
+        logger.info("\n[TRANSFORM] Iniciando transformação e geração de mensagens...")
+        users = transform_users(users, args.mode, args.variants, prefetcher)
+    
+    # LOAD
+    with stage("load"):
+        logger.info("\n[LOAD] Iniciando carregamento e atualização...")
+        stats = load_users(users, args.api_url, args.dry_run, args.concurrency)
+    
+    if state and not args.dry_run:
+        loaded = {user['id'] for user in users if user.get('_loaded')}
+        state.mark_processed(loaded, [user_id for user_id in user_ids if user_id not in loaded])
+        state.save()
+        logger.info(f"Estado da campanha salvo: {len(state.processed)} usuários processados")
+    
+    # SUMMARY
+    logger.info("\n" + "=" * 60)
+    logger.info("Pipeline ETL concluído!")
+    logger.info(f"Total de usuários processados: {len(users)}")
+    logger.info(f"Atualizações bem-sucedidas: {stats['success']}")
+    logger.info(f"Atualizações falhadas: {stats['failed']}")
+    logger.info(f"Atualizações puladas: {stats['skipped']}")
+    logger.info("=" * 60)
+    
+    return stats
+
 def main():
     """Função principal do pipeline ETL"""
     args = parse_args()
@@ -57,39 +190,22 @@ def main():
     logger.info(f"CSV: {args.csv}")
     logger.info(f"API URL: {args.api_url}")
     logger.info(f"Dry Run: {args.dry_run}")
+    logger.info(f"Prefetch: {args.prefetch}")
+    logger.info(f"Concorrência: {args.concurrency} (HTTP/2: {args.http2})")
+    if args.campaign:
+        logger.info(f"Campanha: {args.campaign} (incremental{', completo' if args.full else ''})")
+    if args.profile:
+        logger.info(f"Profile: {args.profile_output}.collapsed / {args.profile_output}.txt")
     logger.info("=" * 60)
     
+    enable_http2(args.http2)
+    prefetcher = MessagePrefetcher(args.mode) if args.prefetch else None
+    
     try:
-        # EXTRACT
-        logger.info("\n[EXTRACT] Iniciando extração de dados...")
-        user_ids = read_csv(args.csv)
-        
-        if not user_ids:
-            logger.error("Nenhum ID encontrado no CSV")
-            sys.exit(1)
-        
-        users = extract_users(user_ids, args.api_url)
-        
-        if not users:
-            logger.error("Nenhum usuário válido encontrado")
-            sys.exit(1)
-        
-        # TRANSFORM
-        logger.info("\n[TRANSFORM] Iniciando transformação e geração de mensagens...")
-        users = transform_users(users, args.mode)
-        
-        # LOAD
-        logger.info("\n[LOAD] Iniciando carregamento e atualização...")
-        stats = load_users(users, args.api_url, args.dry_run)
+        state = CampaignState.load(args.campaign) if args.campaign else None
         
-        # SUMMARY
-        logger.info("\n" + "=" * 60)
-        logger.info("Pipeline ETL concluído!")
-        logger.info(f"Total de usuários processados: {len(users)}")
-        logger.info(f"Atualizações bem-sucedidas: {stats['success']}")
-        logger.info(f"Atualizações falhadas: {stats['failed']}")
-        logger.info(f"Atualizações puladas: {stats['skipped']}")
-        logger.info("=" * 60)
+        with profile_run(args.profile_output) if args.profile else nullcontext():
+            stats = run_pipeline(args, logger, prefetcher, state)
         
         if stats['failed'] > 0:
             sys.exit(1)
@@ -100,6 +216,11 @@ def main():
     except Exception as e:
         logger.error(f"\nErro fatal no pipeline: {e}", exc_info=True)
         sys.exit(1)
+    finally:
+        if prefetcher:
+            prefetcher.close()
+        close_openai_client()
+        close_http2_client()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,234 @@
+"""Profiling por amostragem e marcação de etapas do pipeline"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from src.etl.config import PROFILE_INTERVAL, PROFILE_TOP
+
+logger = logging.getLogger("etl")
+
+ProfileHook = Callable[[str, Dict[str, Any]], None]
+
+_hooks: List[ProfileHook] = []
+_active_profiler: Optional["SamplingProfiler"] = None
+
+# Frames onde a thread está bloqueada (fila, lock, socket, DNS) e não usando
+# CPU: (sufixo do arquivo, função). Threads paradas neles não são amostradas.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("concurrent/futures/thread.py", "_worker"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socket.py", "readinto"),
+    ("socket.py", "create_connection"),
+    ("socket.py", "getaddrinfo"),
+    ("ssl.py", "read"),
+    ("ssl.py", "recv_into"),
+    ("urllib3/util/connection.py", "create_connection"),
+    ("httpcore/_backends/sync.py", "read"),
+    ("httpcore/_backends/sync.py", "connect_tcp"),
+}
+
+def add_profile_hook(hook: ProfileHook) -> None:
+    """
+    Registra um hook chamado como hook(evento, dados)
+
+    Eventos: "stage_start" (stage), "stage_end" (stage, elapsed) e
+    "profile_done" (profiler, collapsed_path, summary_path).
+
+    Args:
+        hook: Função chamada a cada evento
+    """
+    _hooks.append(hook)
+
+def remove_profile_hook(hook: ProfileHook) -> None:
+    """Remove um hook registrado com add_profile_hook"""
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+def _emit(event: str, **payload: Any) -> None:
+    for hook in list(_hooks):
+        try:
+            hook(event, payload)
+        except Exception as e:
+            logger.warning(f"Hook de profiling falhou em '{event}': {e}")
+
+def _is_idle(frame) -> bool:
+    """Indica se o frame do topo da pilha é uma espera bloqueante"""
+    code = frame.f_code
+    filename = code.co_filename.replace("\\", "/")
+    return any(filename.endswith(suffix) and code.co_name == name for suffix, name in IDLE_FRAMES)
+
+def _frame_label(frame) -> str:
+    """Formata um frame como 'função (arquivo:linha)' para o flame graph"""
+    code = frame.f_code
+    filename = os.path.relpath(code.co_filename) if code.co_filename.startswith(os.getcwd()) \
+        else os.path.basename(code.co_filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem de todas as threads do processo
+
+    Uma thread em background captura as pilhas a cada `interval` segundos.
+    Cada amostra é prefixada com a etapa atual do pipeline (ver `stage`),
+    gerando pilhas no formato "collapsed" usado por flamegraph.pl/speedscope.
+    Threads bloqueadas em I/O, locks ou filas (ver `IDLE_FRAMES`) são
+    ignoradas, então as amostras aproximam onde o tempo de CPU é gasto.
+
+    Args:
+        interval: Intervalo entre amostras, em segundos
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.current_stage: Optional[str] = None
+        self.stage_times: Dict[str, float] = {}
+        self.samples: Counter = Counter()
+        self.idle_samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="etl-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            stage = self.current_stage or "(sem etapa)"
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if _is_idle(frame):
+                    self.idle_samples += 1
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame))
+                    frame = frame.f_back
+                stack.reverse()
+                thread_name = names.get(thread_id, str(thread_id)).split("_")[0]
+                self.samples[";".join([f"stage:{stage}", f"thread:{thread_name}"] + stack)] += 1
+
+    def hot_functions(self, top: int = PROFILE_TOP) -> List[Tuple[str, int, int]]:
+        """
+        Funções com mais amostras
+
+        Args:
+            top: Quantidade de funções
+
+        Returns:
+            Lista de (função, amostras próprias, amostras inclusivas)
+        """
+        own = Counter()
+        inclusive = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(";")[2:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for label in set(frames):
+                inclusive[label] += count
+        return [(label, count, inclusive[label]) for label, count in own.most_common(top)]
+
+    def write(self, output_prefix: str, top: int = PROFILE_TOP) -> Tuple[str, str]:
+        """
+        Grava as pilhas collapsed e o resumo das funções mais quentes
+
+        Args:
+            output_prefix: Prefixo dos arquivos (gera .collapsed e .txt)
+            top: Quantidade de funções no resumo
+
+        Returns:
+            (caminho do .collapsed, caminho do resumo .txt)
+        """
+        collapsed_path = f"{output_prefix}.collapsed"
+        summary_path = f"{output_prefix}.txt"
+        total = sum(self.samples.values())
+
+        with open(collapsed_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(f"Amostras: {total} (intervalo {self.interval * 1000:.1f} ms, "
+                    f"{self.idle_samples} de threads ociosas ignoradas)\n\n")
+            f.write("Tempo por etapa:\n")
+            for stage, elapsed in self.stage_times.items():
+                f.write(f"  {stage:<12} {elapsed:8.3f}s\n")
+            f.write(f"\nTop {top} funções (amostras próprias / inclusivas):\n")
+            for label, own, inclusive in self.hot_functions(top):
+                f.write(f"  {own / max(total, 1):6.1%} {inclusive / max(total, 1):6.1%}  {label}\n")
+
+        return collapsed_path, summary_path
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Marca uma etapa do pipeline (extract, transform, load...)
+
+    Mede o tempo da etapa, rotula as amostras do profiler ativo e notifica
+    os hooks registrados. Sem profiler nem hooks, o custo é desprezível.
+
+    Args:
+        name: Nome da etapa
+    """
+    profiler = _active_profiler
+    if profiler:
+        profiler.current_stage = name
+    _emit("stage_start", stage=name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler:
+            profiler.stage_times[name] = profiler.stage_times.get(name, 0.0) + elapsed
+            profiler.current_stage = None
+        _emit("stage_end", stage=name, elapsed=elapsed)
+
+@contextmanager
+def profile_run(output_prefix: str, top: int = PROFILE_TOP,
+                interval: float = PROFILE_INTERVAL) -> Iterator[SamplingProfiler]:
+    """
+    Executa o bloco com o profiler por amostragem e grava os resultados
+
+    Args:
+        output_prefix: Prefixo dos arquivos de saída
+        top: Quantidade de funções no resumo
+        interval: Intervalo entre amostras, em segundos
+
+    Yields:
+        Profiler ativo
+    """
+    global _active_profiler
+
+    profiler = SamplingProfiler(interval)
+    _active_profiler = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active_profiler = None
+        collapsed_path, summary_path = profiler.write(output_prefix, top)
+        logger.info(f"Profile gravado em {collapsed_path} (flame graph) e {summary_path}")
+        for label, own, _ in profiler.hot_functions(min(top, 5)):
+            logger.info(f"  {own:6d} amostras  {label}")
+        _emit("profile_done", profiler=profiler, collapsed_path=collapsed_path, summary_path=summary_path)
@@ -0,0 +1,186 @@
+"""Rate limiting (token bucket) para as APIs externas"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from src.etl.config import (
+    SDW_RATE_LIMIT,
+    SDW_RATE_BURST,
+    OPENAI_RATE_LIMIT,
+    OPENAI_RATE_BURST,
+    OPENAI_TOKENS_PER_MINUTE,
+    RATE_LIMIT_DIR
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem coordenação entre processos
+    fcntl = None
+
+logger = logging.getLogger("etl")
+
+def _refill(available: float, updated: float, now: float, rate: float, burst: float) -> float:
+    """Calcula os tokens disponíveis após reabastecer o bucket até `now`"""
+    return min(burst, available + max(0.0, now - updated) * rate)
+
+def _take(available: float, tokens: float, rate: float) -> Tuple[float, float]:
+    """
+    Tenta retirar tokens do bucket
+
+    Returns:
+        (tokens restantes, segundos a esperar). Espera 0 significa sucesso.
+    """
+    if available >= tokens:
+        return available - tokens, 0.0
+    return available, (tokens - available) / rate
+
+class TokenBucket:
+    """
+    Token bucket thread-safe (coordenação dentro do processo)
+
+    Args:
+        rate: Tokens reabastecidos por segundo (<= 0 desliga o limite)
+        burst: Capacidade máxima do bucket
+        name: Nome usado nos logs
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, name: str = "bucket"):
+        self.rate = rate
+        self.burst = max(burst if burst is not None else rate, 1.0)
+        self.name = name
+        self._available = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _try_acquire(self, tokens: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            available = _refill(self._available, self._updated, now, self.rate, self.burst)
+            self._available, wait = _take(available, tokens, self.rate)
+            self._updated = now
+            return wait
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Bloqueia até haver `tokens` disponíveis e os consome
+
+        Args:
+            tokens: Quantidade de tokens (limitada à capacidade do bucket)
+
+        Returns:
+            Tempo total esperado, em segundos
+        """
+        if not self.enabled:
+            return 0.0
+
+        tokens = min(tokens, self.burst)
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                if waited:
+                    logger.debug(f"Rate limit '{self.name}': aguardou {waited:.2f}s")
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket com estado em arquivo, compartilhado entre processos do host
+
+    O estado (tokens disponíveis e último reabastecimento) fica em um
+    arquivo JSON protegido por `fcntl.flock`, então shards paralelos somam
+    no máximo `rate` tokens/s no total.
+
+    Args:
+        rate: Tokens reabastecidos por segundo (<= 0 desliga o limite)
+        burst: Capacidade máxima do bucket
+        path: Arquivo de estado
+        name: Nome usado nos logs
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, path: str = "", name: str = "bucket"):
+        super().__init__(rate, burst, name)
+        self.path = path
+
+    def _try_acquire(self, tokens: float) -> float:
+        with open(self.path, "a+") as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                content = state_file.read()
+                now = time.time()
+                state = json.loads(content) if content else {"tokens": self.burst, "updated": now}
+
+                available = _refill(state["tokens"], state["updated"], now, self.rate, self.burst)
+                available, wait = _take(available, tokens, self.rate)
+
+                state_file.seek(0)
+                state_file.truncate()
+                state_file.write(json.dumps({"tokens": available, "updated": now}))
+                state_file.flush()
+                return wait
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+# backend -> (tokens/s, burst)
+LIMITS = {
+    "sdw": (SDW_RATE_LIMIT, SDW_RATE_BURST),
+    "openai": (OPENAI_RATE_LIMIT, OPENAI_RATE_BURST),
+    "openai_tokens": (OPENAI_TOKENS_PER_MINUTE / 60, OPENAI_TOKENS_PER_MINUTE),
+}
+
+def create_limiter(name: str, rate: float, burst: Optional[float] = None,
+                   state_dir: Optional[str] = RATE_LIMIT_DIR) -> TokenBucket:
+    """
+    Cria um limitador, compartilhado entre processos se `state_dir` for informado
+
+    Args:
+        name: Nome do backend (também nome do arquivo de estado)
+        rate: Tokens por segundo (<= 0 desliga o limite)
+        burst: Capacidade máxima do bucket
+        state_dir: Diretório dos arquivos de estado (None = só no processo)
+
+    Returns:
+        TokenBucket ou FileTokenBucket
+    """
+    if state_dir and rate > 0:
+        if fcntl is None:
+            logger.warning("Rate limit entre processos indisponível nesta plataforma - usando limite local")
+        else:
+            os.makedirs(state_dir, exist_ok=True)
+            return FileTokenBucket(rate, burst, os.path.join(state_dir, f"{name}.bucket"), name)
+    return TokenBucket(rate, burst, name)
+
+def get_limiter(name: str) -> TokenBucket:
+    """
+    Retorna o limitador compartilhado de um backend ("sdw", "openai" ou "openai_tokens")
+
+    Args:
+        name: Nome do backend (ver LIMITS)
+
+    Returns:
+        Limitador configurado via variáveis de ambiente
+    """
+    limiter = _limiters.get(name)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(name)
+            if limiter is None:
+                rate, burst = LIMITS[name]
+                limiter = _limiters[name] = create_limiter(name, rate, burst)
+    return limiter
+
+def reset_limiters() -> None:
+    """Descarta os limitadores criados (ex.: após mudar LIMITS em testes)"""
+    with _limiters_lock:
+        _limiters.clear()
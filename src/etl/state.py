@@ -0,0 +1,314 @@
+"""Estado persistido por campanha para execuções incrementais"""
+import base64
+import json
+import logging
+import os
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from src.etl.config import STATE_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem coordenação entre processos
+    fcntl = None
+
+logger = logging.getLogger("etl")
+
+# Blocos do IdBitmap: array ordenado até 4096 IDs, bitmap de 65536 bits acima
+_ARRAY_MAX = 4096
+_BITMAP_BYTES = 65536 // 8
+_CONTAINER_HEADER = struct.Struct("<QBI")
+
+def _parse_timestamp(value: str) -> datetime:
+    """Converte data ISO 8601 (com ou sem fuso; sem fuso = UTC)"""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+class IdBitmap:
+    """
+    Conjunto compacto de IDs inteiros (0 a 2**64 - 1), no estilo roaring bitmap
+
+    Os IDs são agrupados em blocos de 65536 pelos bits altos. Cada bloco é um
+    array ordenado de 16 bits enquanto tem menos de 4096 IDs e vira um bitmap
+    de 8 KB acima disso. Memória e serialização crescem com a quantidade de
+    IDs, não com o maior ID: um ID esparso como 10_000_000_000 custa 2 bytes,
+    e 1 milhão de IDs contíguos ocupa 16 bitmaps (128 KB).
+    """
+
+    def __init__(self):
+        self._containers: Dict[int, Union[array, bytearray]] = {}
+
+    @staticmethod
+    def _split(user_id: int) -> Tuple[int, int]:
+        if not 0 <= user_id < 1 << 64:
+            raise ValueError(f"ID inválido para o bitmap: {user_id}")
+        return user_id >> 16, user_id & 0xFFFF
+
+    def _add_low(self, key: int, low: int) -> None:
+        container = self._containers.get(key)
+        if container is None:
+            self._containers[key] = array("H", [low])
+        elif isinstance(container, bytearray):
+            container[low >> 3] |= 1 << (low & 7)
+        else:
+            index = bisect_left(container, low)
+            if index < len(container) and container[index] == low:
+                return
+            if len(container) < _ARRAY_MAX:
+                container.insert(index, low)
+                return
+            bitmap = bytearray(_BITMAP_BYTES)
+            for value in container:
+                bitmap[value >> 3] |= 1 << (value & 7)
+            bitmap[low >> 3] |= 1 << (low & 7)
+            self._containers[key] = bitmap
+
+    def add(self, user_id: int) -> None:
+        self._add_low(*self._split(user_id))
+
+    def discard(self, user_id: int) -> None:
+        key, low = self._split(user_id)
+        container = self._containers.get(key)
+        if container is None:
+            return
+        if isinstance(container, bytearray):
+            container[low >> 3] &= ~(1 << (low & 7)) & 0xFF
+            return
+        index = bisect_left(container, low)
+        if index < len(container) and container[index] == low:
+            del container[index]
+            if not container:
+                del self._containers[key]
+
+    def update(self, user_ids: Iterable[int]) -> None:
+        for user_id in user_ids:
+            self.add(user_id)
+
+    def merge(self, other: "IdBitmap") -> None:
+        """União com outro bitmap (OR bloco a bloco)"""
+        for key, other_container in other._containers.items():
+            container = self._containers.get(key)
+            if isinstance(container, bytearray) and isinstance(other_container, bytearray):
+                merged = int.from_bytes(container, "little") | int.from_bytes(other_container, "little")
+                self._containers[key] = bytearray(merged.to_bytes(_BITMAP_BYTES, "little"))
+            elif isinstance(other_container, bytearray):
+                merged = bytearray(other_container)
+                for value in container or ():
+                    merged[value >> 3] |= 1 << (value & 7)
+                self._containers[key] = merged
+            else:
+                for value in other_container:
+                    self._add_low(key, value)
+
+    def __contains__(self, user_id: int) -> bool:
+        key, low = self._split(user_id)
+        container = self._containers.get(key)
+        if container is None:
+            return False
+        if isinstance(container, bytearray):
+            return bool(container[low >> 3] & (1 << (low & 7)))
+        index = bisect_left(container, low)
+        return index < len(container) and container[index] == low
+
+    def __len__(self) -> int:
+        return sum(
+            int.from_bytes(container, "little").bit_count() if isinstance(container, bytearray)
+            else len(container)
+            for container in self._containers.values()
+        )
+
+    def __iter__(self) -> Iterator[int]:
+        for key in sorted(self._containers):
+            base = key << 16
+            container = self._containers[key]
+            if isinstance(container, array):
+                for value in container:
+                    yield base + value
+                continue
+            for index, byte in enumerate(container):
+                while byte:
+                    low = byte & -byte
+                    yield base + index * 8 + low.bit_length() - 1
+                    byte ^= low
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa o bitmap comprimido
+
+        Cada bloco não vazio vira: chave (8 bytes), tipo (0 = array,
+        1 = bitmap), tamanho do conteúdo (4 bytes) e o conteúdo, com
+        inteiros em little-endian.
+        """
+        chunks = []
+        for key in sorted(self._containers):
+            container = self._containers[key]
+            if isinstance(container, bytearray):
+                kind, payload = 1, bytes(container)
+                if not any(payload):
+                    continue
+            else:
+                kind, values = 0, array("H", container)
+                if sys.byteorder != "little":
+                    values.byteswap()
+                payload = values.tobytes()
+            chunks.append(_CONTAINER_HEADER.pack(key, kind, len(payload)) + payload)
+        return zlib.compress(b"".join(chunks))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "IdBitmap":
+        """Recria o bitmap a partir de to_bytes()"""
+        bitmap = cls()
+        raw = zlib.decompress(data)
+        offset = 0
+        while offset < len(raw):
+            key, kind, size = _CONTAINER_HEADER.unpack_from(raw, offset)
+            offset += _CONTAINER_HEADER.size
+            payload = raw[offset:offset + size]
+            offset += size
+            if kind == 1:
+                bitmap._containers[key] = bytearray(payload)
+            else:
+                values = array("H")
+                values.frombytes(payload)
+                if sys.byteorder != "little":
+                    values.byteswap()
+                bitmap._containers[key] = values
+        return bitmap
+
+class CampaignState:
+    """
+    Watermark e IDs já processados de uma campanha
+
+    Args:
+        campaign: Nome da campanha
+        state_dir: Diretório dos arquivos de estado
+    """
+
+    def __init__(self, campaign: str, state_dir: str = STATE_DIR):
+        self.campaign = campaign
+        self.path = os.path.join(state_dir, f"{campaign}.json")
+        self.processed = IdBitmap()
+        self.last_run_at: Optional[str] = None
+        # Alterações feitas durante esta execução serão vistas na próxima
+        self._run_started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        # Watermark lida do disco, para detectar shards que gravaram depois
+        self._loaded_run_at: Optional[str] = None
+        self._failed: Set[int] = set()
+
+    @classmethod
+    def load(cls, campaign: str, state_dir: str = STATE_DIR) -> "CampaignState":
+        """
+        Carrega o estado da campanha (ou cria um vazio na primeira execução)
+
+        Args:
+            campaign: Nome da campanha
+            state_dir: Diretório dos arquivos de estado
+
+        Returns:
+            Estado da campanha
+        """
+        state = cls(campaign, state_dir)
+        if not os.path.exists(state.path):
+            logger.info(f"Campanha '{campaign}' sem estado anterior - execução completa")
+            return state
+
+        with open(state.path, encoding="utf-8") as f:
+            data = json.load(f)
+        state.processed = IdBitmap.from_bytes(base64.b64decode(data["processed"]))
+        state.last_run_at = state._loaded_run_at = data.get("last_run_at")
+        logger.info(f"Campanha '{campaign}': {len(state.processed)} usuários já processados "
+                    f"(última execução: {state.last_run_at})")
+        return state
+
+    def save(self) -> None:
+        """
+        Grava o estado de forma atômica (arquivo temporário + rename)
+
+        Com `fcntl` disponível, a gravação é feita sob lock: o arquivo é
+        relido e os IDs gravados por shards paralelos da mesma campanha são
+        somados aos desta execução, em vez de sobrescritos.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        if fcntl is None:
+            self._write()
+            return
+
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._merge_stored()
+                self._write()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _merge_stored(self) -> None:
+        """Incorpora o estado gravado por outras execuções desde o load()"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.processed.merge(IdBitmap.from_bytes(base64.b64decode(data["processed"])))
+        for user_id in self._failed:
+            self.processed.discard(user_id)
+
+        stored_run_at = data.get("last_run_at")
+        if stored_run_at and stored_run_at != self._loaded_run_at and self.last_run_at:
+            # Outro shard gravou durante esta execução: vale a watermark mais
+            # antiga, para não pular alterações feitas entre os dois inícios
+            self.last_run_at = min(stored_run_at, self.last_run_at, key=_parse_timestamp)
+
+    def _write(self) -> None:
+        data = {
+            "campaign": self.campaign,
+            "last_run_at": self.last_run_at,
+            "processed_count": len(self.processed),
+            "processed": base64.b64encode(self.processed.to_bytes()).decode("ascii")
+        }
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._loaded_run_at = self.last_run_at
+
+    def pending(self, user_ids: List[int], updated_at: Optional[List[Optional[str]]] = None) -> List[int]:
+        """
+        Filtra os IDs que precisam ser processados nesta execução
+
+        Args:
+            user_ids: IDs lidos do CSV
+            updated_at: Data de alteração (ISO 8601) de cada ID, se o CSV
+                tiver essa coluna. IDs alterados após a última execução
+                são reprocessados.
+
+        Returns:
+            IDs novos ou alterados, na ordem original
+        """
+        if updated_at is None or self.last_run_at is None:
+            return [user_id for user_id in user_ids if user_id not in self.processed]
+
+        watermark = _parse_timestamp(self.last_run_at)
+        return [
+            user_id for user_id, changed in zip(user_ids, updated_at)
+            if user_id not in self.processed or (changed and _parse_timestamp(changed) > watermark)
+        ]
+
+    def mark_processed(self, user_ids: Iterable[int], failed_ids: Iterable[int] = ()) -> None:
+        """
+        Registra IDs processados e avança a watermark
+
+        Args:
+            user_ids: IDs carregados com sucesso nesta execução
+            failed_ids: IDs tentados que falharam; saem do bitmap para
+                continuarem pendentes mesmo com a watermark avançada
+        """
+        self.processed.update(user_ids)
+        for user_id in failed_ids:
+            self.processed.discard(user_id)
+            self._failed.add(user_id)
+        self.last_run_at = self._run_started_at
@@ -1,18 +1,83 @@
 """Módulo de transformação e geração de mensagens"""
 import logging
-from typing import Dict, Any
-from openai import OpenAI
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 from src.etl.config import (
     OPENAI_API_KEY, 
     OPENAI_MODEL, 
     SYSTEM_PROMPT, 
     MAX_MESSAGE_LENGTH,
-    OPENAI_TIMEOUT
+    OPENAI_TIMEOUT,
+    OPENAI_MAX_TOKENS,
+    OPENAI_BASE_URL,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY,
+    MESSAGE_VARIANTS,
+    PREFETCH_WORKERS
 )
+from src.etl.ratelimit import get_limiter
 from src.etl.utils import retry_with_backoff, truncate_message
 
 logger = logging.getLogger("etl")
 
+# Cliente OpenAI compartilhado pelo processo (reaproveita conexões HTTP/TLS)
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+def get_openai_client():
+    """
+    Retorna o cliente OpenAI compartilhado, criando-o na primeira chamada
+    
+    O cliente usa um único pool de conexões HTTP com keep-alive, evitando
+    um novo handshake TLS a cada mensagem gerada. O servidor é definido por
+    OPENAI_BASE_URL (ex.: mock local compatível com OpenAI).
+    
+    Returns:
+        Instância de openai.OpenAI
+    """
+    global _openai_client
+    
+    if _openai_client is not None:
+        return _openai_client
+    
+    with _openai_client_lock:
+        if _openai_client is None:
+            # Import tardio: o SDK da OpenAI só é necessário no modo real
+            import httpx
+            from openai import OpenAI
+            
+            http_client = httpx.Client(
+                timeout=OPENAI_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+                )
+            )
+            _openai_client = OpenAI(
+                api_key=OPENAI_API_KEY,
+                base_url=OPENAI_BASE_URL,
+                timeout=OPENAI_TIMEOUT,
+                http_client=http_client
+            )
+            logger.debug(
+                f"Cliente OpenAI criado (max_connections={OPENAI_MAX_CONNECTIONS}, "
+                f"keepalive={OPENAI_MAX_KEEPALIVE_CONNECTIONS})"
+            )
+    
+    return _openai_client
+
+def close_openai_client() -> None:
+    """Fecha o cliente OpenAI compartilhado e libera o pool de conexões"""
+    global _openai_client
+    
+    with _openai_client_lock:
+        if _openai_client is not None:
+            _openai_client.close()
+            _openai_client = None
+
 @retry_with_backoff()
 def generate_message_openai(user: Dict[str, Any]) -> str:
     """
@@ -27,9 +92,13 @@ def generate_message_openai(user: Dict[str, Any]) -> str:
     if not OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY não configurada")
     
-    client = OpenAI(api_key=OPENAI_API_KEY, timeout=OPENAI_TIMEOUT)
+    client = get_openai_client()
     user_name = user.get('name', 'Cliente')
     
+    # Estimativa de tokens (~4 caracteres por token) + limite da resposta
+    get_limiter("openai").acquire()
+    get_limiter("openai_tokens").acquire((len(SYSTEM_PROMPT) + len(str(user_name))) // 4 + OPENAI_MAX_TOKENS)
+    
     try:
         response = client.chat.completions.create(
             model=OPENAI_MODEL,
@@ -37,7 +106,7 @@ def generate_message_openai(user: Dict[str, Any]) -> str:
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": f"Cliente: {user_name}"}
             ],
-            max_tokens=50,
+            max_tokens=OPENAI_MAX_TOKENS,
             temperature=0.7
         )
         
@@ -93,26 +162,126 @@ def generate_message(user: Dict[str, Any], mode: str = "mock") -> str:
         logger.warning(f"Fallback para mock devido a erro: {e}")
         return generate_message_mock(user)
 
-def transform_users(users: list[Dict[str, Any]], mode: str = "mock") -> list[Dict[str, Any]]:
+def prompt_key(user: Dict[str, Any]) -> str:
+    """
+    Retorna a chave normalizada da entrada do prompt de um usuário
+    
+    O prompt depende apenas do nome do cliente, então usuários com a mesma
+    chave recebem requisições idênticas e podem compartilhar a geração.
+    
+    Args:
+        user: Dados do usuário
+        
+    Returns:
+        Nome com espaços normalizados
+    """
+    return " ".join(str(user.get('name', 'Cliente')).split())
+
+def group_users_by_prompt(users: list[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Agrupa usuários por classe de equivalência de prompt
+    
+    Args:
+        users: Lista de usuários
+        
+    Returns:
+        Dicionário chave do prompt -> usuários do grupo (na ordem original)
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for user in users:
+        groups.setdefault(prompt_key(user), []).append(user)
+    return groups
+
+class MessagePrefetcher:
+    """
+    Gera mensagens antecipadamente em background, enquanto a extração roda
+    
+    As mensagens dependem apenas do nome do usuário, então a geração pode
+    começar assim que o nome é conhecido (resposta do GET ou coluna do CSV).
+    Cada grupo de prompt (`prompt_key`) é gerado no máximo uma vez.
+    """
+    
+    def __init__(self, mode: str = "mock", max_workers: int = PREFETCH_WORKERS):
+        self.mode = mode
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="etl-prefetch")
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, user: Dict[str, Any]) -> None:
+        """Agenda a geração da mensagem do usuário (ignora prompts já agendados)"""
+        key = prompt_key(user)
+        with self._lock:
+            if key not in self._futures:
+                self._futures[key] = self._executor.submit(generate_message, dict(user), self.mode)
+    
+    def pop(self, user: Dict[str, Any]) -> Optional[Future]:
+        """Retorna (e remove) a geração antecipada do prompt do usuário, se houver"""
+        with self._lock:
+            return self._futures.pop(prompt_key(user), None)
+    
+    def close(self) -> None:
+        """Cancela gerações não usadas e encerra as threads"""
+        with self._lock:
+            unused = len(self._futures)
+            self._futures.clear()
+        if unused:
+            logger.info(f"{unused} mensagens pré-geradas não utilizadas")
+        self._executor.shutdown(wait=True, cancel_futures=True)
+    
+    def __enter__(self) -> "MessagePrefetcher":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+def transform_users(
+    users: list[Dict[str, Any]],
+    mode: str = "mock",
+    variants: int = MESSAGE_VARIANTS,
+    prefetcher: Optional[MessagePrefetcher] = None
+) -> list[Dict[str, Any]]:
     """
     Transforma lista de usuários adicionando mensagens
     
+    Gera mensagens uma vez por grupo de usuários com o mesmo prompt
+    (até `variants` variações por grupo) e distribui o resultado aos
+    membros em round-robin.
+    
     Args:
         users: Lista de usuários
         mode: Modo de geração ("real" ou "mock")
+        variants: Número máximo de variações geradas por grupo
+        prefetcher: Gerações antecipadas a reaproveitar como primeira variação
         
     Returns:
         Lista de usuários com mensagens geradas
     """
-    for user in users:
-        try:
-            message = generate_message(user, mode)
-            user['generated_message'] = message
-        except Exception as e:
-            logger.error(f"Erro ao gerar mensagem para usuário {user.get('id')}: {e}")
-            user['generated_message'] = None
+    groups = group_users_by_prompt(users)
+    generations = 0
+    prefetched = 0
+    
+    for members in groups.values():
+        messages = []
+        for variant in range(min(max(variants, 1), len(members))):
+            representative = members[variant]
+            future = prefetcher.pop(representative) if prefetcher and variant == 0 else None
+            try:
+                if future is not None:
+                    message = future.result()
+                    prefetched += 1
+                else:
+                    message = generate_message(representative, mode)
+                    generations += 1
+            except Exception as e:
+                logger.error(f"Erro ao gerar mensagem para usuário {representative.get('id')}: {e}")
+                message = None
+            messages.append(message)
+        
+        for index, user in enumerate(members):
+            user['generated_message'] = messages[index % len(messages)]
     
     successful = sum(1 for u in users if u.get('generated_message'))
-    logger.info(f"Mensagens geradas: {successful}/{len(users)}")
+    logger.info(f"Mensagens geradas: {successful}/{len(users)} "
+                f"({generations} gerações + {prefetched} antecipadas para {len(groups)} grupos de prompt)")
     
     return users
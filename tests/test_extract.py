@@ -1,7 +1,7 @@
 """Testes do módulo extract"""
 import pytest
 from unittest.mock import Mock, patch, mock_open
-from src.etl.extract import read_csv, get_user, extract_users
+from src.etl.extract import read_csv, read_csv_records, get_user, extract_users
 
 def test_read_csv_success(tmp_path):
     """Testa leitura bem-sucedida do CSV"""
@@ -22,6 +22,19 @@ def test_read_csv_empty(tmp_path):
     
     assert user_ids == []
 
+def test_read_csv_records_extra_columns(tmp_path):
+    """Testa leitura de colunas adicionais do CSV"""
+    csv_file = tmp_path / "names.csv"
+    csv_file.write_text("UserID,Name\n1,Ana\n2,\n3,Bruno\n")
+    
+    records = read_csv_records(str(csv_file), ["Name"])
+    
+    assert records == [
+        {"UserID": 1, "Name": "Ana"},
+        {"UserID": 2, "Name": None},
+        {"UserID": 3, "Name": "Bruno"}
+    ]
+
 @patch('src.etl.extract.requests.get')
 def test_get_user_success(mock_get):
     """Testa busca de usuário bem-sucedida"""
@@ -65,3 +78,25 @@ def test_extract_users(mock_get_user):
     assert len(users) == 2
     assert users[0]["id"] == 1
     assert users[1]["id"] == 2
+
+@patch('src.etl.extract.get_user')
+def test_extract_users_on_user_callback(mock_get_user):
+    """Testa callback chamado para cada usuário extraído"""
+    mock_get_user.side_effect = [{"id": 1, "name": "User 1"}, None]
+    seen = []
+    
+    extract_users([1, 2], on_user=seen.append)
+    
+    assert seen == [{"id": 1, "name": "User 1"}]
+
+@patch('src.etl.extract.get_user')
+def test_extract_users_callback_error_keeps_user(mock_get_user):
+    """Testa que erro no callback não descarta o usuário extraído"""
+    mock_get_user.side_effect = [{"id": 1, "name": "User 1"}, {"id": 2, "name": "User 2"}]
+    
+    def failing_callback(user):
+        raise RuntimeError("falha no prefetch")
+    
+    users = extract_users([1, 2], on_user=failing_callback)
+    
+    assert [u["id"] for u in users] == [1, 2]
@@ -0,0 +1,180 @@
+"""Testes do cliente HTTP/2 (contra servidor h2c local)"""
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from unittest.mock import patch
+from src.etl import http_client
+from src.etl.extract import extract_users
+from src.etl.load import load_users
+
+h2_config = pytest.importorskip("h2.config")
+h2_connection = pytest.importorskip("h2.connection")
+h2_events = pytest.importorskip("h2.events")
+
+class H2StubServer:
+    """Servidor HTTP/2 (h2c, prior knowledge) que simula /users/<id>"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen()
+        self.url = f"http://127.0.0.1:{self._sock.getsockname()[1]}"
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        h2 = h2_connection.H2Connection(config=h2_config.H2Configuration(client_side=False))
+        h2.initiate_connection()
+        conn.sendall(h2.data_to_send())
+        streams = {}
+
+        while True:
+            try:
+                data = conn.recv(65535)
+            except OSError:
+                break
+            if not data:
+                break
+            for event in h2.receive_data(data):
+                if isinstance(event, h2_events.RequestReceived):
+                    streams[event.stream_id] = {"headers": dict(event.headers), "body": b""}
+                elif isinstance(event, h2_events.DataReceived):
+                    streams[event.stream_id]["body"] += event.data
+                    h2.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2_events.StreamEnded):
+                    self._respond(h2, event.stream_id, streams.pop(event.stream_id))
+            conn.sendall(h2.data_to_send())
+        conn.close()
+
+    def _respond(self, h2, stream_id, request):
+        method = request["headers"][b":method"].decode()
+        path = request["headers"][b":path"].decode()
+        self.requests.append((method, path))
+        user_id = int(path.rsplit("/", 1)[1])
+
+        if method == "PUT":
+            status, body = 200, request["body"]
+        elif user_id > 100:
+            status, body = 404, json.dumps({"error": "User not found"}).encode()
+        else:
+            status, body = 200, json.dumps({"id": user_id, "name": f"User {user_id}", "news": []}).encode()
+
+        h2.send_headers(stream_id, [
+            (":status", str(status)),
+            ("content-type", "application/json"),
+            ("content-length", str(len(body)))
+        ])
+        h2.send_data(stream_id, body, end_stream=True)
+
+    def close(self):
+        self._sock.close()
+
+@pytest.fixture
+def h2_server():
+    """Servidor h2c local com o cliente HTTP/2 do ETL ligado em prior knowledge"""
+    server = H2StubServer()
+    http_client.close_http2_client()
+    http_client.enable_http2(True)
+    with patch('src.etl.http_client.HTTP2_PRIOR_KNOWLEDGE', True):
+        yield server
+    http_client.close_http2_client()
+    http_client.enable_http2(False)
+    server.close()
+
+@pytest.fixture
+def http1_server():
+    """Servidor somente HTTP/1.1, com o cliente HTTP/2 ligado em prior knowledge"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            user_id = int(self.path.rsplit("/", 1)[1])
+            body = json.dumps({"id": user_id, "name": f"User {user_id}", "news": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    http_client.close_http2_client()
+    http_client.enable_http2(True)
+    with patch('src.etl.http_client.HTTP2_PRIOR_KNOWLEDGE', True):
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    http_client.close_http2_client()
+    http_client.enable_http2(False)
+    server.shutdown()
+    server.server_close()
+
+def test_request_http2_disabled_returns_none():
+    """Testa que sem HTTP/2 ligado a requisição cai para HTTP/1.1"""
+    http_client.enable_http2(False)
+
+    assert http_client.request_http2("GET", "http://127.0.0.1:1/users/1") is None
+
+def test_get_http2_client_without_h2_falls_back():
+    """Testa fallback para HTTP/1.1 quando o pacote h2 não está instalado"""
+    http_client.close_http2_client()
+    http_client.enable_http2(True)
+    try:
+        with patch.dict('sys.modules', {'h2': None}):
+            assert http_client.get_http2_client() is None
+    finally:
+        http_client.enable_http2(False)
+        http_client._http2_unavailable = False
+
+def test_request_http2_uses_http2(h2_server):
+    """Testa requisição via HTTP/2 contra o servidor local"""
+    response = http_client.request_http2("GET", f"{h2_server.url}/users/1")
+
+    assert response.http_version == "HTTP/2"
+    assert response.json()["name"] == "User 1"
+
+def test_extract_and_load_multiplexed_over_one_connection(h2_server):
+    """Testa extract/load concorrentes multiplexados numa única conexão"""
+    users = extract_users(list(range(1, 21)) + [999], h2_server.url, max_workers=8)
+
+    assert [u["id"] for u in users] == list(range(1, 21))
+
+    for user in users:
+        user["generated_message"] = f"Mensagem {user['id']}"
+    stats = load_users(users, h2_server.url, max_workers=8)
+
+    assert stats == {"success": 20, "failed": 0, "skipped": 0}
+    assert len([r for r in h2_server.requests if r[0] == "PUT"]) == 20
+    assert h2_server.connections == 1
+
+def test_http1_server_falls_back_to_http1(http1_server):
+    """Testa fallback automático para HTTP/1.1 quando o servidor não fala h2c"""
+    users = extract_users([1, 2, 3], http1_server)
+    
+    assert [u["id"] for u in users] == [1, 2, 3]
+    assert http1_server in http_client._http1_hosts
+    assert http_client.request_http2("GET", f"{http1_server}/users/1") is None
+
+def test_connect_error_does_not_disable_http2(h2_server):
+    """Testa que falha de conexão vira ConnectionError sem marcar o host como HTTP/1.1"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        closed_url = f"http://127.0.0.1:{sock.getsockname()[1]}"
+    
+    with pytest.raises(requests.exceptions.ConnectionError):
+        http_client.request_http2("GET", f"{closed_url}/users/1")
+    
+    assert closed_url not in http_client._http1_hosts
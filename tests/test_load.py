@@ -96,3 +96,19 @@ def test_load_users(mock_update):
     
     assert stats["success"] == 2
     assert stats["failed"] == 0
+
+@patch('src.etl.load.update_user')
+def test_load_users_marks_loaded(mock_update):
+    """Testa marcação de usuários efetivamente carregados (modo incremental)"""
+    mock_update.side_effect = [True, False]
+    
+    users = [
+        {"id": 1, "generated_message": "Msg", "news": []},
+        {"id": 2, "generated_message": "Msg", "news": []},
+        {"id": 3, "generated_message": "Msg", "news": [{"description": "Msg"}]},
+        {"id": 4, "generated_message": None}
+    ]
+    
+    load_users(users)
+    
+    assert [u.get("_loaded") for u in users] == [True, False, True, None]
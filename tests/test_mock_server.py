@@ -0,0 +1,101 @@
+"""Testes do mock server (scripts/mock_server.py)"""
+import importlib.util
+from pathlib import Path
+import pytest
+
+pytest.importorskip("flask")
+
+_spec = importlib.util.spec_from_file_location(
+    "mock_server", Path(__file__).resolve().parent.parent / "scripts" / "mock_server.py"
+)
+mock_server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(mock_server)
+
+@pytest.fixture
+def client():
+    """Cliente de teste com 1 milhão de usuários gerados"""
+    return mock_server.create_app(num_users=1_000_000, seed=42).test_client()
+
+def test_get_generated_user(client):
+    """Testa usuários gerados sob demanda além dos fixos"""
+    assert client.get("/users/1").get_json()["name"] == "João Silva"
+    
+    response = client.get("/users/999999")
+    
+    assert response.status_code == 200
+    assert response.get_json()["id"] == 999999
+    assert client.get("/users/1000001").status_code == 404
+
+def test_etag_conditional_get_and_put(client):
+    """Testa If-None-Match (304) e If-Match (412) com ETag"""
+    response = client.get("/users/10")
+    etag = response.headers["ETag"]
+    user = response.get_json()
+    
+    assert client.get("/users/10", headers={"If-None-Match": etag}).status_code == 304
+    
+    user["news"] = [{"description": "Nova"}]
+    assert client.put("/users/10", json=user, headers={"If-Match": '"stale"'}).status_code == 412
+    assert client.put("/users/10", json=user, headers={"If-Match": etag}).status_code == 200
+    assert client.get("/users/10").get_json()["news"] == [{"description": "Nova"}]
+
+def test_list_users_all_or_paginated():
+    """Testa GET /users: todos sem parâmetros, paginado com offset/limit"""
+    client = mock_server.create_app(num_users=250).test_client()
+    
+    assert [u["id"] for u in client.get("/users").get_json()] == list(range(1, 251))
+    assert [u["id"] for u in client.get("/users?offset=10&limit=5").get_json()] == [11, 12, 13, 14, 15]
+    assert len(client.get("/users?offset=200").get_json()) == 50
+
+def test_list_users_requires_paging_for_large_stores(client):
+    """Testa que GET /users sem paginação é recusado com milhões de usuários"""
+    assert client.get("/users").status_code == 400
+    assert len(client.get("/users?limit=10").get_json()) == 10
+
+def test_bulk_endpoints(client):
+    """Testa busca e atualização em lote"""
+    response = client.post("/users/bulk-get", json={"ids": [1, 2, 2_000_000]})
+    
+    assert [u["id"] for u in response.get_json()["users"]] == [1, 2]
+    assert response.get_json()["missing"] == [2_000_000]
+    
+    response = client.put("/users/bulk", json={"users": [{"id": 1, "news": []}, {"id": 2_000_000}]})
+    
+    assert response.get_json()["results"] == {"1": 200, "2000000": 404}
+
+def test_fault_injection():
+    """Testa injeção de 429 e 500"""
+    throttled = mock_server.create_app(throttle_rate=1.0).test_client()
+    failing = mock_server.create_app(error_rate=1.0).test_client()
+    
+    response = throttled.get("/users/1")
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert failing.get("/users/1").status_code == 500
+    assert failing.get("/_stats").status_code == 200
+
+def test_stats_per_endpoint(client):
+    """Testa contagem e latência por endpoint"""
+    client.get("/users/1")
+    client.get("/users/2")
+    client.get("/users/0")
+    
+    stats = client.get("/_stats").get_json()
+    
+    assert stats["GET /users/<int:user_id>"]["count"] == 3
+    assert stats["GET /users/<int:user_id>"]["status"] == {"200": 2, "404": 1}
+    assert set(stats["GET /users/<int:user_id>"]["latency_ms"]) == {"avg", "p50", "p95", "max"}
+    
+    assert client.delete("/_stats").status_code == 204
+    assert client.get("/_stats").get_json() == {}
+
+def test_chat_completions_empty_name(client):
+    """Testa a OpenAI simulada com nome vazio no prompt"""
+    response = client.post("/v1/chat/completions", json={
+        "model": "gpt-4",
+        "messages": [{"role": "user", "content": "Cliente: "}]
+    })
+    
+    assert response.status_code == 200
+    assert response.get_json()["choices"][0]["message"]["content"].startswith("Cliente,")
@@ -0,0 +1,223 @@
+"""
+Testes de regressão de desempenho (tempo, vazão e memória por etapa)
+
+Rodam apenas com `pytest -m perf` (ou `make test-perf`), contra servidores
+locais: o mock server da API SDW (que também simula a OpenAI) num subprocesso.
+
+Variáveis de ambiente:
+    ETL_PERF_SIZES       Tamanhos dos datasets (padrão: 1000, o único com baseline;
+                         tamanhos maiores são opcionais: ETL_PERF_SIZES=1000,100000,1000000)
+    ETL_PERF_TOLERANCE   Folga sobre o baseline antes de falhar (padrão: 0.5 = +50%)
+    ETL_PERF_UPDATE      Se "1", grava os resultados como novo baseline
+    ETL_PERF_BASELINES   Arquivo de baselines (padrão: tests/perf_baselines.json)
+
+Os baselines dependem da máquina: ao adotar (ou trocar) o runner de CI,
+regrave-os nele com `ETL_PERF_UPDATE=1 make test-perf` e faça commit do
+arquivo; tamanhos sem baseline só emitem um aviso.
+"""
+import importlib.util
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+from unittest.mock import patch
+import pytest
+import requests
+from src.etl.extract import extract_users
+from src.etl.transform import transform_users, close_openai_client
+from src.etl.load import load_users
+from src.etl.profiling import add_profile_hook, remove_profile_hook, stage
+
+pytestmark = pytest.mark.perf
+
+pytest.importorskip("flask")
+
+MOCK_SERVER_PATH = Path(__file__).resolve().parent.parent / "scripts" / "mock_server.py"
+_spec = importlib.util.spec_from_file_location("mock_server", MOCK_SERVER_PATH)
+mock_server = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(mock_server)
+
+SIZES = [int(size) for size in os.getenv("ETL_PERF_SIZES", "1000").split(",")]
+TOLERANCE = float(os.getenv("ETL_PERF_TOLERANCE", "0.5"))
+UPDATE_BASELINES = os.getenv("ETL_PERF_UPDATE") == "1"
+BASELINES_PATH = Path(os.getenv("ETL_PERF_BASELINES", Path(__file__).parent / "perf_baselines.json"))
+CONCURRENCY = 8
+
+def _load_baselines():
+    if BASELINES_PATH.exists():
+        return json.loads(BASELINES_PATH.read_text())
+    return {}
+
+def _save_baseline(stage, size, result):
+    """Grava o resultado como baseline (ETL_PERF_UPDATE=1)"""
+    baselines = _load_baselines()
+    baselines.setdefault(stage, {})[str(size)] = {
+        "seconds": round(result["seconds"], 4),
+        "peak_mb": round(result["peak_mb"], 3)
+    }
+    BASELINES_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+def measure(name, func, size, prepare=None):
+    """
+    Executa func duas vezes: sem tracemalloc, para tempo de parede e vazão,
+    e com tracemalloc, só para o pico de memória (o tracing deixa o código
+    2-3x mais lento e distorceria o tempo)
+
+    A execução cronometrada roda dentro de `stage(name)`, e o tempo vem do
+    evento "stage_end" recebido por um hook de profiling, o mesmo dado que
+    `--profile` grava por etapa.
+
+    Args:
+        name: Nome da etapa (extract, transform, load)
+        func: Etapa medida; recebe o retorno de prepare(), se informado
+        size: Quantidade de usuários (para a vazão)
+        prepare: Gera entradas novas para cada execução, fora da medição
+
+    Returns:
+        (retorno de func na execução cronometrada, {"seconds", "throughput", "peak_mb"})
+    """
+    stage_times = {}
+
+    def hook(event, payload):
+        if event == "stage_end":
+            stage_times[payload["stage"]] = payload["elapsed"]
+
+    args = (prepare(),) if prepare else ()
+    add_profile_hook(hook)
+    try:
+        with stage(name):
+            value = func(*args)
+    finally:
+        remove_profile_hook(hook)
+    seconds = stage_times[name]
+
+    args = (prepare(),) if prepare else ()
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return value, {"seconds": seconds, "throughput": size / seconds, "peak_mb": peak / 1024 / 1024}
+
+def check_baseline(stage, size, result):
+    """Compara o resultado com o baseline, falhando acima da tolerância"""
+    print(f"\n[perf] {stage} n={size}: {result['seconds']:.3f}s, "
+          f"{result['throughput']:.0f} usuários/s, pico {result['peak_mb']:.2f} MB")
+
+    if UPDATE_BASELINES:
+        _save_baseline(stage, size, result)
+        return
+
+    baseline = _load_baselines().get(stage, {}).get(str(size))
+    if baseline is None:
+        warnings.warn(f"Sem baseline para {stage} n={size}; rode com ETL_PERF_UPDATE=1 para gravar")
+        return
+
+    max_seconds = baseline["seconds"] * (1 + TOLERANCE)
+    max_peak_mb = baseline["peak_mb"] * (1 + TOLERANCE)
+    assert result["seconds"] <= max_seconds, (
+        f"{stage} n={size} levou {result['seconds']:.3f}s (baseline {baseline['seconds']:.3f}s, "
+        f"limite {max_seconds:.3f}s)"
+    )
+    assert result["peak_mb"] <= max_peak_mb, (
+        f"{stage} n={size} usou {result['peak_mb']:.2f} MB (baseline {baseline['peak_mb']:.2f} MB, "
+        f"limite {max_peak_mb:.2f} MB)"
+    )
+
+def synthetic_users(size):
+    """Usuários no mesmo formato da API (nomes repetidos, como numa base real)"""
+    return [dict(mock_server.generate_user(user_id), news=[]) for user_id in range(1, size + 1)]
+
+@pytest.fixture(scope="module")
+def stand_in_url():
+    """
+    Mock server (API SDW + OpenAI) em outro processo, com usuários para o
+    maior dataset, para não disputar o GIL nem entrar na medição de memória
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, str(MOCK_SERVER_PATH), "--host", "127.0.0.1", "--port", str(port),
+         "--users", str(max(SIZES))],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.monotonic() + 15
+        while True:
+            try:
+                requests.get(f"{url}/_stats", timeout=1)
+                break
+            except requests.exceptions.ConnectionError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    pytest.fail("Mock server não iniciou")
+                time.sleep(0.1)
+        yield url
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+@pytest.fixture(autouse=True)
+def quiet_logging():
+    """Evita que o log por usuário domine a medição (e a memória do pytest)"""
+    logger = logging.getLogger("etl")
+    previous = logger.level
+    logger.setLevel(logging.ERROR)
+    yield
+    logger.setLevel(previous)
+
+@pytest.mark.parametrize("size", SIZES)
+def test_extract_users_performance(stand_in_url, size):
+    """Mede extract_users (GET /users/<id>) contra o mock server"""
+    user_ids = list(range(1, size + 1))
+    
+    users, result = measure("extract", lambda: extract_users(user_ids, stand_in_url, max_workers=CONCURRENCY),
+                            size)
+
+    assert len(users) == size
+    check_baseline("extract", size, result)
+
+@pytest.mark.parametrize("size", SIZES)
+def test_transform_users_performance(stand_in_url, size):
+    """Mede transform_users em modo real contra a OpenAI simulada pelo mock server"""
+    requests.delete(f"{stand_in_url}/_stats", timeout=5)
+    close_openai_client()
+    try:
+        # Sem fallback silencioso para o mock: toda mensagem tem de vir da API
+        with patch('src.etl.transform.OPENAI_API_KEY', 'perf-key'), \
+             patch('src.etl.transform.OPENAI_BASE_URL', f"{stand_in_url}/v1"), \
+             patch('src.etl.transform.generate_message_mock', side_effect=AssertionError("fallback para mock")):
+            users, result = measure("transform", lambda users: transform_users(users, mode="real"),
+                                    size, prepare=lambda: synthetic_users(size))
+    finally:
+        close_openai_client()
+
+    completions = requests.get(f"{stand_in_url}/_stats", timeout=5).json().get("POST /v1/chat/completions")
+    assert completions and completions["count"] > 0
+    assert completions["status"] == {"200": completions["count"]}
+    assert all(user["generated_message"] for user in users)
+    check_baseline("transform", size, result)
+
+@pytest.mark.parametrize("size", SIZES)
+def test_load_users_performance(stand_in_url, size):
+    """Mede load_users (PUT /users/<id>) contra o mock server"""
+    def prepare():
+        users = synthetic_users(size)
+        for user in users:
+            user["generated_message"] = f"{user['name']}, invista no seu futuro!"
+        return users
+
+    stats, result = measure("load", lambda users: load_users(users, stand_in_url, max_workers=CONCURRENCY),
+                            size, prepare=prepare)
+
+    assert stats["success"] == size
+    check_baseline("load", size, result)
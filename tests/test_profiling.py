@@ -0,0 +1,91 @@
+"""Testes do módulo profiling"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.etl.profiling import (
+    SamplingProfiler,
+    add_profile_hook,
+    remove_profile_hook,
+    profile_run,
+    stage
+)
+
+def _busy(seconds):
+    """Consome CPU por `seconds` segundos"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def test_stage_notifies_hooks():
+    """Testa eventos de início/fim de etapa enviados aos hooks"""
+    events = []
+    
+    def hook(event, payload):
+        events.append((event, payload.get("stage")))
+    
+    add_profile_hook(hook)
+    try:
+        with stage("extract"):
+            pass
+    finally:
+        remove_profile_hook(hook)
+    
+    assert events == [("stage_start", "extract"), ("stage_end", "extract")]
+
+def test_profile_run_writes_collapsed_and_summary(tmp_path):
+    """Testa gravação do flame graph (collapsed) e do resumo"""
+    prefix = str(tmp_path / "profile")
+    done = []
+    
+    def hook(event, payload):
+        if event == "profile_done":
+            done.append(payload)
+    
+    add_profile_hook(hook)
+    try:
+        with profile_run(prefix, top=5, interval=0.001) as profiler:
+            with stage("transform"):
+                _busy(0.1)
+    finally:
+        remove_profile_hook(hook)
+    
+    collapsed = (tmp_path / "profile.collapsed").read_text().splitlines()
+    summary = (tmp_path / "profile.txt").read_text()
+    
+    assert collapsed
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed)
+    assert any(line.startswith("stage:transform;thread:MainThread;") and "_busy" in line for line in collapsed)
+    assert "transform" in profiler.stage_times
+    assert "_busy" in summary
+    assert done[0]["profiler"] is profiler
+    assert done[0]["collapsed_path"] == prefix + ".collapsed"
+
+def test_profile_run_skips_idle_threads(tmp_path):
+    """Testa que threads bloqueadas (pool ocioso, Event.wait) não entram nas amostras"""
+    release = threading.Event()
+    waiter = threading.Thread(target=release.wait, name="waiter")
+    waiter.start()
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(int).result()
+            with profile_run(str(tmp_path / "profile"), interval=0.001) as profiler:
+                _busy(0.1)
+    finally:
+        release.set()
+        waiter.join()
+    
+    leaves = {stack.rsplit(";", 1)[1] for stack in profiler.samples}
+    
+    assert profiler.idle_samples > 0
+    assert any(leaf.startswith("_busy ") for leaf in leaves)
+    assert not any(leaf.startswith(("_worker ", "wait ")) for leaf in leaves)
+
+def test_hot_functions_counts_own_and_inclusive():
+    """Testa ranking de funções por amostras próprias e inclusivas"""
+    profiler = SamplingProfiler()
+    profiler.samples.update({
+        "stage:load;thread:MainThread;main;update_user": 3,
+        "stage:load;thread:MainThread;main": 1
+    })
+    
+    assert profiler.hot_functions(2) == [("update_user", 3, 3), ("main", 1, 4)]
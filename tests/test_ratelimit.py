@@ -0,0 +1,89 @@
+"""Testes do módulo ratelimit"""
+import multiprocessing
+import time
+import pytest
+from unittest.mock import patch
+from src.etl.ratelimit import (
+    fcntl,
+    TokenBucket,
+    FileTokenBucket,
+    create_limiter,
+    get_limiter,
+    reset_limiters
+)
+
+requires_fcntl = pytest.mark.skipif(fcntl is None, reason="fcntl indisponível (Windows)")
+
+def _acquire_many(path, count):
+    """Consome `count` tokens de um bucket em arquivo (executado em outro processo)"""
+    bucket = FileTokenBucket(rate=20, burst=1, path=path)
+    for _ in range(count):
+        bucket.acquire()
+
+def test_token_bucket_disabled():
+    """Testa que rate <= 0 não limita"""
+    bucket = TokenBucket(rate=0)
+    
+    assert bucket.acquire() == 0.0
+
+def test_token_bucket_burst_then_throttle():
+    """Testa burst imediato seguido de espera proporcional ao rate"""
+    bucket = TokenBucket(rate=50, burst=5)
+    start = time.monotonic()
+    
+    for _ in range(5):
+        bucket.acquire()
+    burst_elapsed = time.monotonic() - start
+    
+    for _ in range(5):
+        bucket.acquire()
+    total_elapsed = time.monotonic() - start
+    
+    assert burst_elapsed < 0.05
+    assert total_elapsed >= 0.09
+
+def test_token_bucket_weighted_acquire():
+    """Testa consumo de vários tokens por chamada (ex.: tokens do LLM)"""
+    bucket = TokenBucket(rate=100, burst=100)
+    
+    assert bucket.acquire(100) == 0.0
+    assert bucket.acquire(10) > 0
+
+@requires_fcntl
+def test_create_limiter_file_backend(tmp_path):
+    """Testa criação do limitador compartilhado entre processos"""
+    limiter = create_limiter("sdw", rate=10, burst=2, state_dir=str(tmp_path))
+    
+    assert isinstance(limiter, FileTokenBucket)
+    limiter.acquire()
+    assert (tmp_path / "sdw.bucket").exists()
+
+@requires_fcntl
+def test_file_token_bucket_shared_across_processes(tmp_path):
+    """Testa que processos paralelos dividem o mesmo bucket"""
+    path = str(tmp_path / "shared.bucket")
+    processes = [multiprocessing.Process(target=_acquire_many, args=(path, 5)) for _ in range(2)]
+    start = time.monotonic()
+    
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=10)
+    elapsed = time.monotonic() - start
+    
+    # 10 tokens a 20/s com burst 1: pelo menos ~9 reabastecimentos de 50ms
+    assert all(process.exitcode == 0 for process in processes)
+    assert elapsed >= 0.4
+
+def test_get_limiter_uses_config():
+    """Testa limitador por backend configurado via LIMITS"""
+    reset_limiters()
+    try:
+        with patch.dict('src.etl.ratelimit.LIMITS', {"sdw": (5, 3)}):
+            limiter = get_limiter("sdw")
+        
+        assert limiter is get_limiter("sdw")
+        assert limiter.rate == 5
+        assert limiter.burst == 3
+    finally:
+        reset_limiters()
@@ -0,0 +1,38 @@
+"""Testes de tempo de inicialização do CLI (imports tardios)"""
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+def _imported_modules(statement: str) -> set[str]:
+    """Executa o statement num interpretador novo com -X importtime e retorna os módulos importados"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return modules
+
+def test_main_import_does_not_load_heavy_dependencies():
+    """Testa que importar o CLI não carrega pandas nem o SDK da OpenAI"""
+    modules = _imported_modules("import src.etl.main")
+    
+    assert "src.etl.main" in modules
+    assert "pandas" not in modules
+    assert "openai" not in modules
+
+def test_mock_transform_does_not_load_openai():
+    """Testa que o modo mock não importa o SDK da OpenAI"""
+    modules = _imported_modules(
+        "from src.etl.transform import transform_users; "
+        "transform_users([{'id': 1, 'name': 'Ana'}], mode='mock')"
+    )
+    
+    assert "openai" not in modules
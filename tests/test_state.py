@@ -0,0 +1,107 @@
+"""Testes do módulo state (execuções incrementais)"""
+import pytest
+from src.etl.state import IdBitmap, CampaignState, fcntl
+
+def test_id_bitmap_membership_and_roundtrip():
+    """Testa inclusão, contagem e serialização do bitmap"""
+    bitmap = IdBitmap()
+    bitmap.update([1, 8, 9, 1_000_000])
+    
+    restored = IdBitmap.from_bytes(bitmap.to_bytes())
+    
+    assert 8 in restored and 1_000_000 in restored
+    assert 2 not in restored and 5_000_000 not in restored
+    assert len(restored) == 4
+    assert list(restored) == [1, 8, 9, 1_000_000]
+
+def test_id_bitmap_sparse_high_ids():
+    """Testa que IDs esparsos e altos não alocam memória proporcional ao maior ID"""
+    bitmap = IdBitmap()
+    bitmap.update([5, 10_000_000_000, 2**63])
+    
+    restored = IdBitmap.from_bytes(bitmap.to_bytes())
+    
+    assert list(restored) == [5, 10_000_000_000, 2**63]
+    assert 10_000_000_001 not in restored
+    assert len(bitmap.to_bytes()) < 100
+    
+    dense = IdBitmap()
+    dense.update(range(70_000))
+    dense.merge(restored)
+    
+    assert len(dense) == 70_002
+    assert 10_000_000_000 in dense
+
+def test_id_bitmap_discard_and_negative_ids():
+    """Testa remoção de IDs e rejeição de IDs negativos"""
+    bitmap = IdBitmap()
+    bitmap.update([3, 4])
+    bitmap.discard(3)
+    bitmap.discard(1_000)
+    
+    assert list(bitmap) == [4]
+    for operation in (bitmap.add, bitmap.discard, bitmap.__contains__):
+        with pytest.raises(ValueError):
+            operation(-1)
+    with pytest.raises(ValueError):
+        bitmap.add(2**64)
+
+def test_id_bitmap_compact_for_contiguous_ids():
+    """Testa que faixas contíguas ocupam pouco espaço serializado"""
+    bitmap = IdBitmap()
+    bitmap.update(range(1, 1_000_001))
+    
+    assert len(bitmap.to_bytes()) < 2_000
+
+def test_campaign_state_persists_processed_ids(tmp_path):
+    """Testa que a segunda execução processa apenas IDs novos"""
+    state = CampaignState.load("natal", str(tmp_path))
+    
+    assert state.pending([1, 2, 3]) == [1, 2, 3]
+    
+    state.mark_processed([1, 2, 3])
+    state.save()
+    reloaded = CampaignState.load("natal", str(tmp_path))
+    
+    assert reloaded.pending([1, 2, 3, 4, 5]) == [4, 5]
+    assert reloaded.last_run_at is not None
+
+def test_campaign_state_reprocesses_changed_ids(tmp_path):
+    """Testa reprocessamento de IDs alterados após a última execução"""
+    state = CampaignState("natal", str(tmp_path))
+    state.mark_processed([1, 2, 3])
+    state.last_run_at = "2024-06-01T00:00:00+00:00"
+    
+    pending = state.pending([1, 2, 3, 4], ["2024-01-01", "2024-07-01T10:00:00Z", None, None])
+    
+    assert pending == [2, 4]
+
+def test_campaign_state_keeps_failed_changed_ids_pending(tmp_path):
+    """Testa que IDs alterados que falharam continuam pendentes após a watermark avançar"""
+    state = CampaignState("natal", str(tmp_path))
+    state.mark_processed([1, 2, 3])
+    state.last_run_at = "2024-06-01T00:00:00+00:00"
+    updated_at = ["2024-07-01", "2024-07-01", None]
+    assert state.pending([1, 2, 3], updated_at) == [1, 2]
+    
+    state.mark_processed([1], failed_ids=[2])
+    state.save()
+    reloaded = CampaignState.load("natal", str(tmp_path))
+    
+    assert reloaded.pending([1, 2, 3], updated_at) == [2]
+
+@pytest.mark.skipif(fcntl is None, reason="merge entre processos requer fcntl")
+def test_campaign_state_merges_parallel_shards(tmp_path):
+    """Testa que shards paralelos somam seus IDs em vez de sobrescrever"""
+    CampaignState("natal", str(tmp_path)).save()
+    shard_a = CampaignState.load("natal", str(tmp_path))
+    shard_b = CampaignState.load("natal", str(tmp_path))
+    
+    shard_a.mark_processed([1, 2])
+    shard_a.save()
+    shard_b.mark_processed([3], failed_ids=[2])
+    shard_b.save()
+    reloaded = CampaignState.load("natal", str(tmp_path))
+    
+    assert list(reloaded.processed) == [1, 3]
+    assert reloaded.pending([1, 2, 3, 4]) == [2, 4]
@@ -1,13 +1,71 @@
 """Testes do módulo transform"""
+import json
+import threading
 import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 from src.etl.transform import (
     generate_message_mock,
     generate_message_openai,
     generate_message,
-    transform_users
+    transform_users,
+    prompt_key,
+    group_users_by_prompt,
+    MessagePrefetcher,
+    get_openai_client,
+    close_openai_client
 )
 
+@pytest.fixture(autouse=True)
+def reset_openai_client():
+    """Garante um cliente OpenAI novo em cada teste"""
+    close_openai_client()
+    yield
+    close_openai_client()
+
+@pytest.fixture
+def openai_stub_server():
+    """Servidor local compatível com /v1/chat/completions que conta conexões"""
+    connections = []
+    
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+        
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            name = request["messages"][-1]["content"].replace("Cliente: ", "")
+            body = json.dumps({
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [{
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": f"{name}, invista hoje!"}
+                }]
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1", connections
+    server.shutdown()
+    server.server_close()
+
 def test_generate_message_mock():
     """Testa geração de mensagem mock"""
     user = {"id": 1, "name": "João Silva"}
@@ -28,14 +86,14 @@ def test_generate_message_mock_no_name():
     assert message is not None
     assert len(message) <= 100
 
-@patch('src.etl.transform.OpenAI')
-def test_generate_message_openai(mock_openai_class):
+@patch('src.etl.transform.get_openai_client')
+def test_generate_message_openai(mock_get_client):
     """Testa geração via OpenAI"""
     mock_client = Mock()
     mock_response = Mock()
     mock_response.choices = [Mock(message=Mock(content="Invista no seu futuro hoje!"))]
     mock_client.chat.completions.create.return_value = mock_response
-    mock_openai_class.return_value = mock_client
+    mock_get_client.return_value = mock_client
     
     user = {"id": 1, "name": "Maria"}
     
@@ -45,6 +103,32 @@ def test_generate_message_openai(mock_openai_class):
     assert message == "Invista no seu futuro hoje!"
     assert len(message) <= 100
 
+@patch('openai.OpenAI')
+def test_get_openai_client_reused(mock_openai_class):
+    """Testa que o cliente OpenAI é criado uma única vez por processo"""
+    first = get_openai_client()
+    second = get_openai_client()
+    
+    assert first is second
+    assert mock_openai_class.call_count == 1
+    
+    close_openai_client()
+    get_openai_client()
+    
+    assert mock_openai_class.call_count == 2
+
+def test_generate_message_openai_reuses_connection(openai_stub_server):
+    """Testa várias gerações contra servidor local reutilizando uma conexão"""
+    base_url, connections = openai_stub_server
+    
+    with patch('src.etl.transform.OPENAI_API_KEY', 'test-key'), \
+         patch('src.etl.transform.OPENAI_BASE_URL', base_url):
+        messages = [generate_message_openai({"id": i, "name": name})
+                    for i, name in enumerate(["Ana", "Bruno", "Carla"])]
+    
+    assert messages == ["Ana, invista hoje!", "Bruno, invista hoje!", "Carla, invista hoje!"]
+    assert len(connections) == 1
+
 def test_generate_message_mode_mock():
     """Testa generate_message em modo mock"""
     user = {"id": 1, "name": "Carlos"}
@@ -77,3 +161,70 @@ def test_transform_users():
     assert len(transformed) == 2
     assert all('generated_message' in u for u in transformed)
     assert all(u['generated_message'] is not None for u in transformed)
+
+def test_prompt_key_normalizes_whitespace():
+    """Testa normalização da chave do prompt"""
+    assert prompt_key({"name": "  Ana   Costa "}) == "Ana Costa"
+    assert prompt_key({"id": 1}) == "Cliente"
+
+def test_group_users_by_prompt():
+    """Testa agrupamento de usuários com o mesmo nome"""
+    users = [
+        {"id": 1, "name": "Ana Costa"},
+        {"id": 2, "name": "Bruno"},
+        {"id": 3, "name": "Ana  Costa"}
+    ]
+    
+    groups = group_users_by_prompt(users)
+    
+    assert list(groups) == ["Ana Costa", "Bruno"]
+    assert [u["id"] for u in groups["Ana Costa"]] == [1, 3]
+
+@patch('src.etl.transform.generate_message')
+def test_transform_users_deduplicates_generation(mock_generate):
+    """Testa que usuários com o mesmo nome compartilham uma única geração"""
+    mock_generate.side_effect = lambda user, mode: f"Msg {user['name']}"
+    users = [{"id": i, "name": "Ana" if i % 2 else "Bruno"} for i in range(6)]
+    
+    transform_users(users, mode="real")
+    
+    assert mock_generate.call_count == 2
+    assert all(u["generated_message"] == f"Msg {u['name']}" for u in users)
+
+@patch('src.etl.transform.generate_message')
+def test_transform_users_variants_round_robin(mock_generate):
+    """Testa distribuição round-robin de variações dentro do grupo"""
+    mock_generate.side_effect = ["V1", "V2"]
+    users = [{"id": i, "name": "Ana"} for i in range(5)]
+    
+    transform_users(users, mode="real", variants=2)
+    
+    assert mock_generate.call_count == 2
+    assert [u["generated_message"] for u in users] == ["V1", "V2", "V1", "V2", "V1"]
+
+@patch('src.etl.transform.generate_message')
+def test_message_prefetcher_deduplicates(mock_generate):
+    """Testa que o prefetcher agenda uma geração por prompt"""
+    mock_generate.return_value = "Msg"
+    
+    with MessagePrefetcher("mock", max_workers=2) as prefetcher:
+        prefetcher.submit({"id": 1, "name": "Ana"})
+        prefetcher.submit({"id": 2, "name": "Ana "})
+        
+        assert prefetcher.pop({"name": "Ana"}).result() == "Msg"
+        assert prefetcher.pop({"name": "Ana"}) is None
+    
+    assert mock_generate.call_count == 1
+
+def test_transform_users_uses_prefetched_messages():
+    """Testa que transform_users reaproveita gerações antecipadas"""
+    users = [{"id": 1, "name": "Ana"}, {"id": 2, "name": "Bruno"}]
+    
+    with MessagePrefetcher("mock") as prefetcher:
+        prefetcher.submit({"id": 1, "name": "Ana"})
+        with patch('src.etl.transform.generate_message', return_value="Sync") as mock_generate:
+            transform_users(users, mode="mock", prefetcher=prefetcher)
+    
+    assert "Ana" in users[0]["generated_message"]
+    assert users[1]["generated_message"] == "Sync"
+    assert mock_generate.call_count == 1